@@ -0,0 +1,85 @@
+"""Autocompletion for the dropdown entries.
+
+A Completer lowercases its options once and indexes every word start, so a
+keystroke is a bisect into that index instead of a scan of every option.
+Matches come back best first and capped at `limit`: options that start
+with the query, then options with a word that does, then any other option
+containing it. OptionCache keeps one Completer per option source and
+rebuilds it only when the tables it was built from have changed.
+"""
+from bisect import bisect_left
+from itertools import islice
+
+MATCH_LIMIT = 50
+
+
+class Completer:
+    def __init__(self, options):
+        self.options = list(options)
+        self.lowered = [o.lower() for o in self.options]
+        starts = []
+        for i, text in enumerate(self.lowered):
+            starts.append((text, i, False))
+            starts += [(text[j:], i, True) for j in range(1, len(text))
+                       if text[j].isalnum() and not text[j - 1].isalnum()]
+        starts.sort()
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.options)
+
+    def _word_hits(self, query):
+        """Indexes of options starting with `query`, and of the others with a word that does."""
+        prefix, words = set(), set()
+        for text, i, inner in islice(self.starts, bisect_left(self.starts, (query,)), None):
+            if not text.startswith(query):
+                break
+            (words if inner else prefix).add(i)
+        return prefix, words - prefix
+
+    def matches(self, query, limit=MATCH_LIMIT, exclude=()):
+        """Up to `limit` options matching `query` (case-insensitive), best first, skipping `exclude`."""
+        query = query.strip().lower()
+        out = []
+        if not query:
+            for o in self.options:
+                if o not in exclude:
+                    out.append(o)
+                    if len(out) >= limit: break
+            return out
+        prefix, words = self._word_hits(query)
+        seen = set()
+        for group in (sorted(prefix), sorted(words)):
+            for i in group:
+                if self.options[i] not in exclude:
+                    out.append(self.options[i])
+                    if len(out) >= limit: return out
+            seen.update(group)
+        for i, text in enumerate(self.lowered):
+            if query in text and i not in seen and self.options[i] not in exclude:
+                out.append(self.options[i])
+                if len(out) >= limit: break
+        return out
+
+
+class OptionCache:
+    """One Completer per named option source, rebuilt when its tables change.
+
+    `get(name, tables, build)` calls `build()` for the option list only when
+    `name` is new or one of the repository `tables` it depends on has been
+    edited or reloaded from disk since the last call.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._entries = {}
+
+    def _version(self, tables):
+        return tuple(self.repo.tables[t].changes_since(None)[1] for t in tables)
+
+    def get(self, name, tables, build):
+        version = self._version(tables)
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != version:
+            entry = self._entries[name] = (version, Completer(build()))
+        return entry[1]
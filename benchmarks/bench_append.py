@@ -0,0 +1,47 @@
+"""Insert latency versus roster size: journaled append vs. full-file rewrite.
+
+    python benchmarks/bench_append.py --sizes 1k,10k,100k,1M --inserts 200
+
+The append path (one journal record per insert) should stay flat as the
+roster grows; the rewrite path checkpoints student.csv after every insert,
+which is what every save did before, grows linearly and is only run up to
+--rewrite-max rows.
+"""
+import argparse
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes, students, file_size_mb
+from store import Repository
+
+
+def bench(n, inserts, rewrite):
+    with tempfile.TemporaryDirectory() as d:
+        paths = make_roster(d, n)
+        repo = Repository(*paths)
+        new_rows = list(students(inserts, seed=1, start=n))
+        t0 = time.perf_counter()
+        for row in new_rows:
+            repo.insert("students", row)
+            if rewrite:
+                repo.backend.compact()
+        per_insert = (time.perf_counter() - t0) / inserts
+        assert len(repo.students) == n + inserts
+        return per_insert, file_size_mb(paths[0])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1k,10k,100k,1M")
+    ap.add_argument("--inserts", type=int, default=200)
+    ap.add_argument("--rewrite-max", type=int, default=100_000)
+    args = ap.parse_args()
+    print(f"{'rows':>9} {'file MB':>8} {'append ms/insert':>17} {'rewrite ms/insert':>18}")
+    for n in parse_sizes(args.sizes):
+        append, size = bench(n, args.inserts, rewrite=False)
+        rewrite = f"{bench(n, min(args.inserts, 20), rewrite=True)[0] * 1e3:18.3f}" if n <= args.rewrite_max else f"{'-':>18}"
+        print(f"{n:>9} {size:8.1f} {append * 1e3:17.3f} {rewrite}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
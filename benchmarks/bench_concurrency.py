@@ -0,0 +1,81 @@
+"""Many workstations writing the same CSV roster at once.
+
+    python benchmarks/bench_concurrency.py --writers 1,5,20 --commits 100 --size 10k
+
+Each writer is a separate process with its own Repository on the shared
+files. It adds `--commits` students, and every fourth commit instead edits
+one of a few shared "hot" students with a version-stamp check, retrying on
+a conflict. Afterwards a fresh load must hold every added student (no lost
+writes) and the hot rows must be intact. Reports total commits per second,
+the median and worst commit latency, and how many edits hit a conflict.
+"""
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes, students, student_id
+from store import Repository, ConflictError
+
+HOT = 4
+
+
+def writer(paths, n, worker, commits, barrier, out):
+    repo = Repository(*paths)
+    rows = students(commits, seed=worker, start=n + worker * commits)
+    latencies, conflicts = [], 0
+    barrier.wait()
+    t0 = time.perf_counter()
+    for i in range(commits):
+        start = time.perf_counter()
+        if i % 4 == 3:
+            key = student_id(i % HOT)
+            while True:
+                repo.refresh()
+                stamp, row = repo.stamp("students", key), repo.students.get(key)
+                try:
+                    repo.update("students", key, dict(row, lastname=f"W{worker}-{i}"), expected=stamp)
+                    break
+                except ConflictError:
+                    conflicts += 1
+            next(rows)
+        else:
+            repo.insert("students", next(rows))
+        latencies.append(time.perf_counter() - start)
+    out.put((time.perf_counter() - t0, latencies, conflicts, commits - commits // 4))
+
+
+def bench(n, writers, commits):
+    with tempfile.TemporaryDirectory() as d:
+        paths = make_roster(d, n)
+        Repository(*paths)
+        barrier, out = multiprocessing.Barrier(writers), multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=writer, args=(paths, n, w, commits, barrier, out)) for w in range(writers)]
+        for p in procs: p.start()
+        results = [out.get() for _ in procs]
+        for p in procs: p.join()
+        final = Repository(*paths)
+        added = sum(r[3] for r in results)
+        assert len(final.students) == n + added, f"lost writes: {n + added - len(final.students)}"
+        assert all(final.students.get(student_id(i)) for i in range(HOT))
+        latencies = sorted(x for r in results for x in r[1])
+        wall = max(r[0] for r in results)
+        return writers * commits / wall, statistics.median(latencies) * 1e3, latencies[-1] * 1e3, sum(r[2] for r in results)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--writers", default="1,5,20")
+    ap.add_argument("--commits", type=int, default=100, help="commits per writer")
+    ap.add_argument("--size", default="10k", help="students on the roster to start with")
+    args = ap.parse_args()
+    n = parse_sizes(args.size)[0]
+    print(f"{'writers':>8} {'commits/s':>10} {'p50 ms':>7} {'max ms':>8} {'conflicts':>10}")
+    for w in parse_sizes(args.writers):
+        rate, p50, worst, conflicts = bench(n, w, args.commits)
+        print(f"{w:>8} {rate:10.0f} {p50:7.2f} {worst:8.1f} {conflicts:>10}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
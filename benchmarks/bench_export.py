@@ -0,0 +1,56 @@
+"""Export throughput and peak memory per format versus roster size.
+
+    python benchmarks/bench_export.py --sizes 100k,1M
+
+Exports the joined student view (unfiltered; --sort to order it by a
+column) to CSV, JSONL and the columnar format. "peak MB" is the tracemalloc
+peak above the loaded roster during a second, traced run; it should not
+grow with the row count beyond the list of matching keys (8 bytes per row),
+plus one sort key per row with --sort.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from roster import make_roster, parse_sizes, file_size_mb
+from exporter import export_view, read_columnar
+from store import Repository
+from views import StudentView, STUDENT_COLUMNS
+
+
+def bench(view, path, fmt, sort):
+    t0 = time.perf_counter()
+    n = export_view(view, path, sort=sort, fmt=fmt)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    export_view(view, path, sort=sort, fmt=fmt)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return n, elapsed, peak / 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100k,1M")
+    ap.add_argument("--sort", choices=STUDENT_COLUMNS)
+    args = ap.parse_args()
+    sort = [(STUDENT_COLUMNS.index(args.sort), False)] if args.sort else None
+    print(f"{'rows':>9} {'format':>9} {'file MB':>8} {'seconds':>8} {'MB/s':>7} {'peak MB':>8}")
+    for size in parse_sizes(args.sizes):
+        with tempfile.TemporaryDirectory() as d:
+            view = StudentView(Repository(*make_roster(d, size)))
+            view.sync()
+            for fmt, ext in (("csv", "csv"), ("jsonl", "jsonl"), ("columnar", "scol")):
+                path = os.path.join(d, f"export.{ext}")
+                n, elapsed, peak = bench(view, path, fmt, sort)
+                assert n == size
+                mb = file_size_mb(path)
+                print(f"{size:>9} {fmt:>9} {mb:8.1f} {elapsed:8.2f} {mb / elapsed:7.1f} {peak:8.1f}", flush=True)
+            assert sum(1 for _ in read_columnar(path, ["ID"])) == size
+
+
+if __name__ == "__main__":
+    main()
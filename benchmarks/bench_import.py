@@ -0,0 +1,66 @@
+"""Bulk import throughput and transient memory versus intake size.
+
+    python benchmarks/bench_import.py --sizes 10k,100k,500k --chunk 10000
+
+Each intake file mixes program codes and names and has one bad record in
+fifty. "transient MB" is the traced peak during the import minus what is
+still held afterwards (the imported rows themselves); it should stay flat
+as the intake grows, since only one chunk is in flight at a time.
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from roster import make_roster, parse_sizes, programs, students
+from importer import import_students
+from store import Repository
+
+
+def write_intake(path, n, start):
+    names = {p["prog_code"]: p["name"] for p in programs()}
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["id", "firstname", "lastname", "program", "year", "gender"])
+        w.writeheader()
+        for i, row in enumerate(students(n, seed=2, start=start)):
+            code = row.pop("prog_code")
+            row["program"] = names.get(code, "") if i % 2 else code
+            if i % 50 == 0:
+                row["year"] = "9"
+            w.writerow(row)
+
+
+def bench(n, chunk, existing):
+    with tempfile.TemporaryDirectory() as d:
+        paths = make_roster(d, existing)
+        intake = os.path.join(d, "intake.csv")
+        write_intake(intake, n, start=existing)
+        repo = Repository(*paths)
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        counts = import_students(repo, intake, os.path.join(d, "rejects.csv"), chunk)
+        elapsed = time.perf_counter() - t0
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert counts["rejected"] == (n + 49) // 50
+        assert len(Repository(*paths).students) == existing + counts["imported"]
+        return elapsed, (peak - held) / 1e6, (held - base) / 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="10k,100k,500k")
+    ap.add_argument("--chunk", type=int, default=10_000)
+    ap.add_argument("--existing", type=int, default=10_000, help="students already on the roster")
+    args = ap.parse_args()
+    print(f"{'rows':>9} {'seconds':>8} {'rows/s':>9} {'transient MB':>13} {'held MB':>8}")
+    for n in parse_sizes(args.sizes):
+        elapsed, transient, held = bench(n, args.chunk, args.existing)
+        print(f"{n:>9} {elapsed:8.2f} {n / elapsed:9.0f} {transient:13.1f} {held:8.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Cold import time of the headless core vs. the GUI module.
+
+    python benchmarks/bench_import_time.py --runs 10
+
+Each measurement is a fresh interpreter importing one module; the headless
+modules must not pull in tkinter (the script fails if they do).
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from roster import ROOT
+
+PROBE = ("import sys, time; t = time.perf_counter(); import {module}; "
+         "print(time.perf_counter() - t, 'tkinter' in sys.modules)")
+
+
+def measure(module, runs):
+    times, tk = [], False
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(out[0]))
+        tk = tk or out[1] == "True"
+    return statistics.median(times), tk
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+    print(f"{'module':<12} {'median ms':>10} {'loads tkinter':>14}")
+    failed = False
+    for module, headless in (("store", True), ("views", True), ("cli", True), ("infosystem", False)):
+        t, tk = measure(module, args.runs)
+        print(f"{module:<12} {t * 1e3:10.2f} {str(tk):>14}", flush=True)
+        failed = failed or (headless and tk)
+    if failed:
+        sys.exit("a headless module imported tkinter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Cost of keeping the joined Students view current, versus a full rebuild.
+
+    python benchmarks/bench_join.py --sizes 100k,1M
+
+"rebuild" is what every Students refresh used to cost; the other columns
+are what the join cache pays for a tab switch with nothing changed, one
+added student, one edited student and a renamed program (about 1/40 of
+the roster re-joined).
+"""
+import argparse
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes, students
+from store import Repository
+from views import StudentView
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1e3
+
+
+def bench(n):
+    with tempfile.TemporaryDirectory() as d:
+        repo = Repository(*make_roster(d, n))
+        view = StudentView(repo)
+        first = timed(lambda: view.search(""))
+        switch = timed(lambda: view.search(""))
+        rebuild = timed(view.build_rows)
+        new = next(students(1, seed=3, start=n))
+        repo.insert("students", new)
+        add = timed(view.sync)
+        row = dict(repo.students.get(new["id"]), lastname="Edited")
+        repo.update("students", new["id"], row)
+        edit = timed(view.sync)
+        prog = dict(repo.programs.get("P001"), name="Renamed Program")
+        repo.update_cascade("programs", "P001", prog)
+        rename = timed(view.sync)
+        assert view.rows == view.build_rows()
+        return first, switch, rebuild, add, edit, rename
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100k,1M")
+    args = ap.parse_args()
+    print(f"{'rows':>9} {'first ms':>9} {'switch ms':>10} {'rebuild ms':>11} {'add ms':>7} {'edit ms':>8} {'program ms':>11}")
+    for n in parse_sizes(args.sizes):
+        first, switch, rebuild, add, edit, rename = bench(n)
+        print(f"{n:>9} {first:9.1f} {switch:10.1f} {rebuild:11.1f} {add:7.2f} {edit:8.2f} {rename:11.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Resident size of the student table and its joined view: dict rows versus records.
+
+    python benchmarks/bench_memory.py --sizes 100k,1M
+
+"dicts" is the previous layout (a dict per student and a list per joined
+row), "records" the slotted rows from records.py with interned codes and
+tuple view rows. Sizes are what tracemalloc sees allocated for each part;
+"load" is the wall time to read the CSV into the table (without tracing).
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+
+from roster import make_roster, parse_sizes
+from store import Repository, Table, iter_csv, STUDENT_HEADERS
+from views import StudentView
+
+
+def load_dicts(path):
+    return {r["id"]: {h: (r.get(h) or "") for h in STUDENT_HEADERS} for r in iter_csv(path)}
+
+
+def load_records(path):
+    table = Table("students", STUDENT_HEADERS, "id", ref="prog_code")
+    table.rows = {row["id"]: row for row in map(table.conform, iter_csv(path))}
+    return table.rows
+
+
+def traced(fn):
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    out = fn()
+    gc.collect()
+    return out, (tracemalloc.get_traced_memory()[0] - before) / 2**20
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def bench(n):
+    with tempfile.TemporaryDirectory() as d:
+        paths = make_roster(d, n)
+        view = StudentView(Repository(*paths))
+        view.joins = view.build_joins()
+        view.repo.students.rows, view.repo.students.refs = {}, {}
+        out = []
+        for load, make_row in ((load_dicts, lambda s: list(view.join(s))), (load_records, view.join)):
+            seconds = timed(lambda: load(paths[0]))
+            tracemalloc.start()
+            rows, table_mb = traced(lambda: load(paths[0]))
+            joined, view_mb = traced(lambda rows=rows: {k: make_row(s) for k, s in rows.items()})
+            tracemalloc.stop()
+            del rows, joined
+            out.append((table_mb, view_mb, seconds))
+        return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100k,1M")
+    args = ap.parse_args()
+    print(f"{'rows':>9} {'layout':>8} {'table MB':>9} {'view MB':>8} {'total MB':>9} {'load s':>7}")
+    for n in parse_sizes(args.sizes):
+        for layout, (table_mb, view_mb, seconds) in zip(("dicts", "records"), bench(n)):
+            print(f"{n:>9} {layout:>8} {table_mb:9.1f} {view_mb:8.1f} {table_mb + view_mb:9.1f} {seconds:7.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
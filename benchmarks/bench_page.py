@@ -0,0 +1,53 @@
+"""Cost of showing the Students tab: the full row list versus one keyset page.
+
+    python benchmarks/bench_page.py --sizes 100k,1M --page-size 100
+
+"full" is the complete result list the table used to receive. "first" is
+the first page, "next" the following page through its cursor (the first
+call that builds the cached key list), "jump" a page near the end by
+offset, and the "sorted" columns the same with the rows ordered by Name.
+"""
+import argparse
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes
+from store import Repository
+from views import StudentView, STUDENT_COLUMNS
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1e3, out
+
+
+def bench(n, size):
+    with tempfile.TemporaryDirectory() as d:
+        view = StudentView(Repository(*make_roster(d, n)))
+        view.sync()
+        full, _ = timed(lambda: view.search(""))
+        out = []
+        for sort in (None, [(STUDENT_COLUMNS.index("Name"), False)]):
+            view._paged = None
+            first, page = timed(lambda: view.page(sort=sort, size=size))
+            nxt, _ = timed(lambda: view.page(sort=sort, size=size, cursor=page.last))
+            jump, _ = timed(lambda: view.page(sort=sort, size=size, offset=n - 2 * size))
+            out += [first, nxt, jump]
+        return [full] + out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100k,1M")
+    ap.add_argument("--page-size", type=int, default=100)
+    args = ap.parse_args()
+    print(f"{'rows':>9} {'full ms':>8} {'first ms':>9} {'next ms':>8} {'jump ms':>8} "
+          f"{'sorted first':>13} {'sorted next':>12} {'sorted jump':>12}")
+    for n in parse_sizes(args.sizes):
+        r = bench(n, args.page_size)
+        print(f"{n:>9} {r[0]:8.1f} {r[1]:9.1f} {r[2]:8.2f} {r[3]:8.2f} {r[4]:13.1f} {r[5]:12.2f} {r[6]:12.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
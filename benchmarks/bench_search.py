@@ -0,0 +1,47 @@
+"""Search-box query latency: trigram index vs. the old linear scan.
+
+    python benchmarks/bench_search.py --sizes 10k,100k,1M
+
+For each roster size the Students view is loaded, its index is built once,
+and each query is timed against the scan show_students used to do
+(`any(q in str(c).lower() for c in r)` over every joined row).
+"""
+import argparse
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes
+from store import Repository
+from views import StudentView
+
+QUERIES = ["santos", "2003-04", "villanueva, bea", "program 017", "engineering", "nursing", "zzz"]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); out = fn(); best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="10k,100k,1M")
+    args = ap.parse_args()
+    for n in parse_sizes(args.sizes):
+        with tempfile.TemporaryDirectory() as d:
+            view = StudentView(Repository(*make_roster(d, n)))
+            view.sync()
+            build, _ = timed(lambda: view._build_index(), repeat=1)
+            rows = list(view.rows.values())
+            print(f"\n{n} students, index built in {build:.2f}s")
+            print(f"{'query':>18} {'hits':>8} {'scan ms':>9} {'index ms':>9} {'speedup':>8}")
+            for q in QUERIES:
+                scan, expected = timed(lambda: [r for r in rows if any(q in str(c).lower() for c in r)])
+                indexed, got = timed(lambda: view.search(q))
+                assert got == expected, q
+                print(f"{q:>18} {len(got):>8} {scan * 1e3:9.1f} {indexed * 1e3:9.2f} {scan / max(indexed, 1e-9):7.0f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
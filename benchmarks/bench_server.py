@@ -0,0 +1,104 @@
+"""Load test for the HTTP/JSON service (server.py).
+
+    python benchmarks/bench_server.py --clients 1,8,32 --seconds 10 --size 100k
+
+The service runs in its own process on a synthetic roster; each client is
+a separate process with a RemoteRepository, issuing what a desk does for
+`--seconds`: opening the student list sorted by name and paging on,
+searching, filtering by year, looking a student up, and (one request in
+twenty) editing one with a version-stamp check. Reports requests per
+second over all clients, median and p99 latency, and the p99 per kind of
+request.
+"""
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes, student_id, LAST
+from store import Repository, ConflictError, YEAR_LEVELS
+from remote import RemoteRepository
+from server import make_server
+
+KINDS = ["page", "next", "search", "filter", "get", "edit"]
+WEIGHTS = [4, 6, 4, 2, 3, 1]
+
+
+def serve(paths, threads, ready):
+    server = make_server(Repository(*paths), port=0, threads=threads)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def client(port, n, worker, seconds, barrier, out):
+    repo = RemoteRepository(f"127.0.0.1:{port}")
+    view = repo.make_views()["Students"]
+    rnd = random.Random(worker)
+    latencies = {k: [] for k in KINDS}
+    page = None
+    barrier.wait()
+    end = time.perf_counter() + seconds
+    while True:
+        kind = rnd.choices(KINDS, WEIGHTS)[0]
+        start = time.perf_counter()
+        if start >= end:
+            break
+        if kind == "page" or (kind == "next" and page is None):
+            page = view.page(sort=[(1, False)])
+        elif kind == "next":
+            page = view.page(sort=[(1, False)], cursor=page.last) if page.last else None
+        elif kind == "search":
+            view.page(rnd.choice(LAST)[:rnd.randint(2, 5)])
+        elif kind == "filter":
+            view.page(filters={"year": {rnd.choice(YEAR_LEVELS)}}, sort=[(0, True)])
+        elif kind == "get":
+            repo.students.get(student_id(rnd.randrange(n)))
+        else:
+            key = student_id(rnd.randrange(n))
+            row, stamp = repo.students.get(key), repo.stamp("students", key)
+            try:
+                repo.update("students", key, dict(row, firstname=f"W{worker}"), expected=stamp)
+            except ConflictError:
+                pass
+        latencies[kind].append(time.perf_counter() - start)
+    out.put(latencies)
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] * 1e3 if values else 0.0
+
+
+def bench(port, n, clients, seconds):
+    barrier, out = multiprocessing.Barrier(clients), multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client, args=(port, n, w, seconds, barrier, out)) for w in range(clients)]
+    for p in procs: p.start()
+    results = [out.get() for _ in procs]
+    for p in procs: p.join()
+    per_kind = {k: sorted(x for r in results for x in r[k]) for k in KINDS}
+    every = sorted(x for xs in per_kind.values() for x in xs)
+    return len(every) / seconds, percentile(every, 0.5), percentile(every, 0.99), {k: percentile(v, 0.99) for k, v in per_kind.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", default="1,8,32")
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--size", default="100k", help="students on the roster")
+    ap.add_argument("--threads", type=int, default=32, help="service worker threads")
+    args = ap.parse_args()
+    n = parse_sizes(args.size)[0]
+    with tempfile.TemporaryDirectory() as d:
+        ready = multiprocessing.Queue()
+        service = multiprocessing.Process(target=serve, args=(make_roster(d, n), args.threads, ready), daemon=True)
+        service.start()
+        port = ready.get()
+        print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7}  " + " ".join(f"{k:>7}" for k in KINDS) + "  (p99 ms)")
+        for c in parse_sizes(args.clients):
+            rate, p50, p99, kinds = bench(port, n, c, args.seconds)
+            print(f"{c:>8} {rate:8.0f} {p50:7.2f} {p99:7.2f}  " + " ".join(f"{kinds[k]:7.2f}" for k in KINDS), flush=True)
+        service.terminate()
+
+
+if __name__ == "__main__":
+    main()
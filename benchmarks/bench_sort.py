@@ -0,0 +1,50 @@
+"""Header-click sort cost: per-row natural keys versus cached column ranks.
+
+    python benchmarks/bench_sort.py --sizes 100k,500k
+
+"natural" sorts with a natural_key() call per row (the previous
+sort_column); "first" is the rank sort including building the column's
+rank cache, "cached" is a repeat click (e.g. flipping direction) and
+"multi" a two-column Year desc / Name sort with both caches warm.
+"""
+import argparse
+import tempfile
+import time
+
+from roster import make_roster, parse_sizes
+from store import Repository
+from views import StudentView, natural_key, STUDENT_COLUMNS
+
+NAME, YEAR = STUDENT_COLUMNS.index("Name"), STUDENT_COLUMNS.index("Year")
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1e3
+
+
+def bench(n):
+    with tempfile.TemporaryDirectory() as d:
+        view = StudentView(Repository(*make_roster(d, n)))
+        rows = view.search("")
+        natural = timed(lambda: list(rows).sort(key=lambda r: natural_key(r[NAME])))
+        first = timed(lambda: view.sort_rows(list(rows), [(NAME, False)]))
+        cached = timed(lambda: view.sort_rows(list(rows), [(NAME, True)]))
+        view.sort_ranks(YEAR)
+        multi = timed(lambda: view.sort_rows(list(rows), [(YEAR, True), (NAME, False)]))
+        return natural, first, cached, multi
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100k,500k")
+    args = ap.parse_args()
+    print(f"{'rows':>9} {'natural ms':>11} {'first ms':>9} {'cached ms':>10} {'multi ms':>9}")
+    for n in parse_sizes(args.sizes):
+        natural, first, cached, multi = bench(n)
+        print(f"{n:>9} {natural:11.1f} {first:9.1f} {cached:10.1f} {multi:9.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Synthetic rosters for the benchmark scripts.
+
+Importing this module also puts the repository root on sys.path so the
+benchmarks can be run directly, e.g. `python benchmarks/bench_append.py`.
+"""
+import csv
+import os
+import pathlib
+import random
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from store import STUDENT_HEADERS, PROGRAM_HEADERS, COLLEGE_HEADERS  # noqa: E402
+
+FIRST = ["Maria", "Jose", "Ana", "Juan", "Lorenza", "Zandro", "Diwa", "Carlo", "Bea", "Migs", "Rhea", "Paolo"]
+LAST = ["Santos", "Reyes", "Cruz", "Bautista", "Kua", "Araneta", "Garcia", "Mendoza", "Torres", "Villanueva"]
+COLLEGES = [("CCS", "College Of Computer Studies"), ("COE", "College Of Engineering"),
+            ("CAS", "College Of Arts And Sciences"), ("CED", "College Of Education"),
+            ("CBA", "College Of Business Administration"), ("CON", "College Of Nursing")]
+
+
+def student_id(i):
+    return f"{2000 + i // 10000:04d}-{i % 10000:04d}"
+
+
+def programs(count=40):
+    return [{"prog_code": f"P{i:03d}", "name": f"BS Program {i:03d}", "college_code": COLLEGES[i % len(COLLEGES)][0]}
+            for i in range(1, count + 1)]
+
+
+def students(n, seed=0, start=0):
+    rnd = random.Random(seed)
+    progs = [p["prog_code"] for p in programs()] + [""]
+    for i in range(start, start + n):
+        yield {"id": student_id(i), "firstname": rnd.choice(FIRST), "lastname": rnd.choice(LAST),
+               "prog_code": rnd.choice(progs), "year": str(rnd.randint(1, 5)),
+               "gender": rnd.choice(["Male", "Female", "Other"])}
+
+
+def make_roster(directory, n, seed=0):
+    """Write student/program/college CSVs with `n` students; return their paths."""
+    directory = pathlib.Path(directory)
+    paths = {name: str(directory / f"{name}.csv") for name in ("student", "program", "college")}
+    with open(paths["college"], "w", newline="") as f:
+        w = csv.writer(f); w.writerow(COLLEGE_HEADERS); w.writerows(COLLEGES)
+    with open(paths["program"], "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=PROGRAM_HEADERS); w.writeheader(); w.writerows(programs())
+    with open(paths["student"], "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=STUDENT_HEADERS); w.writeheader(); w.writerows(students(n, seed))
+    return paths["student"], paths["program"], paths["college"]
+
+
+def parse_sizes(text):
+    """'1k,10k,1M' -> [1000, 10000, 1000000]"""
+    mult = {"k": 1_000, "m": 1_000_000}
+    out = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        out.append(int(float(part[:-1]) * mult[part[-1]]) if part[-1] in mult else int(part))
+    return out
+
+
+def file_size_mb(path):
+    return os.path.getsize(path) / 1e6
@@ -0,0 +1,182 @@
+"""Headless command-line access to the student directory.
+
+Runs the same repository, search and filter code as the GUI without
+importing tkinter, so lookups, exports and batch jobs work on servers with
+no display:
+
+    python cli.py search santos
+    python cli.py filter --year 1 --college "College Of Engineering"
+    python cli.py add student --id 2024-0001 --firstname Ana --lastname Cruz --program P001 --year 1 --gender Female
+    python cli.py import intake.csv --rejects rejects.csv
+    python cli.py export report.csv --query cruz --sort Year:desc --sort Name
+    python cli.py export roster.scol
+    python cli.py stats
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+
+from exporter import export_view, FORMATS
+from importer import import_students, CHUNK_ROWS
+from store import open_repository, YEAR_LEVELS, GENDERS
+from views import make_views
+
+SECTIONS = {"students": "Students", "programs": "Programs", "colleges": "Colleges"}
+
+
+def _filters(args):
+    return {"gender": args.gender or [], "year": args.year or [], "program": args.program or [], "college": args.college or []}
+
+
+def _rows(views, args):
+    view = views[SECTIONS[args.section]]
+    if args.section == "students":
+        return view.columns, view.search(args.query or "", _filters(args))
+    return view.columns, view.search(args.query or "")
+
+
+def _print_rows(columns, rows, args):
+    rows = rows[:args.limit] if args.limit else rows
+    if args.json:
+        json.dump([dict(zip(columns, r)) for r in rows], sys.stdout, indent=2)
+        print()
+        return
+    writer = csv.writer(sys.stdout, delimiter="\t", lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(rows)
+
+
+def cmd_search(repo, views, args):
+    _print_rows(*_rows(views, args), args)
+
+
+def cmd_add(repo, views, args):
+    if args.table == "student":
+        prog_code = repo.resolve_program(args.program)
+        if prog_code is None:
+            sys.exit(f"Unknown program '{args.program}'.")
+        row = {"id": args.id, "firstname": args.firstname.title(), "lastname": args.lastname.title(),
+               "prog_code": prog_code, "year": args.year, "gender": args.gender}
+        error = repo.student_error(row)
+        if error:
+            sys.exit(error)
+        repo.insert("students", row)
+    elif args.table == "program":
+        code, name = args.code.strip().upper(), args.name.strip().title()
+        if not (code and name):
+            sys.exit("Please give both --code and --name.")
+        if code in repo.programs:
+            sys.exit(f"Program code '{code}' already exists.")
+        if args.college and args.college not in repo.colleges:
+            sys.exit(f"Unknown college '{args.college}'.")
+        repo.insert("programs", {"prog_code": code, "name": name, "college_code": args.college or ""})
+    else:
+        code, name = args.code.strip().upper(), args.name.strip().title()
+        if not (code and name):
+            sys.exit("Please give both --code and --name.")
+        if code in repo.colleges:
+            sys.exit(f"College code '{code}' already exists.")
+        repo.insert("colleges", {"college_code": code, "name": name})
+    print(f"Added {args.table}.")
+
+
+def cmd_import(repo, views, args):
+    counts = import_students(repo, args.file, args.rejects, args.chunk)
+    print(f"Imported {counts['imported']} student(s), rejected {counts['rejected']}"
+          + (f" (see {args.rejects})." if args.rejects and counts["rejected"] else "."))
+
+
+def cmd_export(repo, views, args):
+    view = views[SECTIONS[args.section]]
+    sort = []
+    for spec in args.sort or []:
+        col, _, order = spec.partition(":")
+        if col not in view.columns or order not in ("", "asc", "desc"):
+            sys.exit(f"Bad sort '{spec}': use COLUMN[:asc|:desc] with one of: {', '.join(view.columns)}.")
+        sort.append((view.columns.index(col), order == "desc"))
+    filters = _filters(args) if args.section == "students" else None
+    n = export_view(view, args.file, args.query, filters, sort, args.format)
+    print(f"Exported {n} row(s) to {args.file}.")
+
+
+def cmd_stats(repo, views, args):
+    stats = repo.enrollment()
+    print(f"students\t{stats['students']}\nprograms\t{stats['programs']}\ncolleges\t{stats['colleges']}")
+    programs, colleges = Counter({"Not Enrolled": stats["not_enrolled"]}), Counter({"N/A": stats["not_enrolled"] + stats["no_college"]})
+    for _, name, n in stats["program"]: programs[name] += n
+    for _, name, n in stats["college"]: colleges[name] += n
+    for title, counts in (("gender", stats["gender"]), ("year", stats["year"]), ("program", programs), ("college", colleges)):
+        print(f"\n{title}")
+        for value, n in sorted(counts.items()):
+            if n: print(f"  {value}\t{n}")
+
+
+def _add_query_args(p):
+    p.add_argument("--section", choices=list(SECTIONS), default="students")
+    p.add_argument("--gender", action="append", choices=GENDERS)
+    p.add_argument("--year", action="append", choices=YEAR_LEVELS)
+    p.add_argument("--program", action="append", metavar="NAME")
+    p.add_argument("--college", action="append", metavar="NAME")
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="cli.py", description="Student directory without the GUI.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("search", help="rows containing a query string")
+    p.add_argument("query")
+    _add_query_args(p)
+    p.add_argument("--limit", type=int)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("filter", help="students matching filter facets")
+    p.add_argument("--query", default="")
+    _add_query_args(p)
+    p.add_argument("--limit", type=int)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("add", help="add one student, program or college")
+    p.add_argument("table", choices=["student", "program", "college"])
+    p.add_argument("--id", default="")
+    p.add_argument("--firstname", default="")
+    p.add_argument("--lastname", default="")
+    p.add_argument("--program", default="", help="program code or name (empty: Not Enrolled)")
+    p.add_argument("--year", default="")
+    p.add_argument("--gender", default="")
+    p.add_argument("--code", default="")
+    p.add_argument("--name", default="")
+    p.add_argument("--college", default="", help="college code for a new program")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("import", help="bulk-add students from a CSV or JSONL file")
+    p.add_argument("file")
+    p.add_argument("--rejects", metavar="CSV", help="write rejected records and reasons here")
+    p.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="records validated per batch")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="stream a (searched/filtered/sorted) view to CSV, JSONL or columnar")
+    p.add_argument("file")
+    p.add_argument("--format", choices=sorted(set(FORMATS.values())), help="default: from the file extension")
+    p.add_argument("--query", default="")
+    _add_query_args(p)
+    p.add_argument("--sort", action="append", metavar="COLUMN[:desc]",
+                   help="column heading to sort by, e.g. 'Year:desc'; repeat for tie-breakers")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("stats", help="enrollment counts")
+    p.set_defaults(func=cmd_stats)
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    repo = open_repository()
+    args.func(repo, make_views(repo), args)
+
+
+if __name__ == "__main__":
+    main()
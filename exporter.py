@@ -0,0 +1,160 @@
+"""Streaming export of a section's rows to CSV, JSONL or a columnar file.
+
+Rows come from SectionView.iter_rows() and go straight to disk, so memory
+does not grow with the export. The columnar format (".scol") is a small
+Parquet-like layout for analytics jobs:
+
+    MAGIC | row group | row group | ... | footer JSON | footer length (u32) | MAGIC
+
+Each row group holds up to ROW_GROUP_ROWS rows stored column by column. A
+column chunk is dictionary-encoded (distinct strings plus u16/u32 indexes)
+when its values repeat, which the program/college/year/gender columns
+always do, and plain (u32 offsets plus UTF-8 bytes) otherwise. The footer
+lists the columns and, per row group, the row count and each chunk's
+offset, length, encoding and index type. All integers are little-endian.
+"""
+import csv
+import json
+import struct
+import sys
+from array import array
+from itertools import count, islice
+from json.encoder import encode_basestring
+from operator import itemgetter
+
+MAGIC = b"SSISCOL1"
+ROW_GROUP_ROWS = 65_536
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".scol": "columnar"}
+_U32 = struct.Struct("<I")
+
+
+def format_for(path):
+    """The export format named by the file's extension (CSV if unknown)."""
+    return next((f for ext, f in FORMATS.items() if path.lower().endswith(ext)), "csv")
+
+
+def _counted(rows, counter):
+    # zip pulls from `rows` first, so `counter` ends at the number of rows.
+    return map(itemgetter(0), zip(rows, counter))
+
+
+def write_csv_rows(f, columns, rows):
+    counter = count()
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    writer.writerows(_counted(rows, counter))
+    return next(counter)
+
+
+def write_jsonl_rows(f, columns, rows, batch=4096):
+    """One JSON object per line; keys are encoded once and lines written in batches."""
+    keys = [encode_basestring(c) + ":" for c in columns]
+    line = lambda row: "{" + ",".join(map(str.__add__, keys, map(encode_basestring, map(str, row)))) + "}\n"
+    n, rows = 0, iter(rows)
+    while True:
+        lines = list(map(line, islice(rows, batch)))
+        if not lines:
+            return n
+        f.write("".join(lines))
+        n += len(lines)
+
+
+def _le(arr):
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr); arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, data):
+    arr = array(typecode, data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _strings(values):
+    """u32 offsets followed by the concatenated UTF-8 bytes."""
+    encoded = [v.encode() for v in values]
+    offsets = array("I", [0])
+    total = 0
+    for b in encoded:
+        total += len(b); offsets.append(total)
+    return _le(offsets) + b"".join(encoded)
+
+
+def _encode_chunk(values):
+    """(payload, encoding, index typecode) for one column of a row group."""
+    distinct = dict.fromkeys(values)
+    if len(distinct) > len(values) // 2:
+        return _strings(values), "plain", None
+    ids = {v: i for i, v in enumerate(distinct)}
+    typecode = "H" if len(ids) <= 0xFFFF else "I"
+    return _U32.pack(len(ids)) + _strings(list(ids)) + _le(array(typecode, map(ids.__getitem__, values))), "dict", typecode
+
+
+def write_columnar_rows(f, columns, rows, row_group_rows=ROW_GROUP_ROWS):
+    f.write(MAGIC)
+    pos, groups, n = len(MAGIC), [], 0
+    rows = iter(rows)
+    while True:
+        group = list(islice(rows, row_group_rows))
+        if not group:
+            break
+        chunks = []
+        for i in range(len(columns)):
+            payload, encoding, typecode = _encode_chunk(list(map(str, map(itemgetter(i), group))))
+            f.write(payload)
+            chunks.append([pos, len(payload), encoding, typecode])
+            pos += len(payload)
+        groups.append({"rows": len(group), "columns": chunks})
+        n += len(group)
+    footer = json.dumps({"version": 1, "columns": list(columns), "row_groups": groups}).encode()
+    f.write(footer + _U32.pack(len(footer)) + MAGIC)
+    return n
+
+
+def _decode_strings(data, n):
+    offsets = _from_le("I", data[:4 * (n + 1)])
+    body = data[4 * (n + 1):]
+    return [body[offsets[i]:offsets[i + 1]].decode() for i in range(n)], 4 * (n + 1) + offsets[n]
+
+
+def _decode_chunk(data, rows, encoding, typecode):
+    if encoding == "plain":
+        return _decode_strings(data, rows)[0]
+    values, used = _decode_strings(data[4:], _U32.unpack_from(data)[0])
+    return [values[i] for i in _from_le(typecode, data[4 + used:])]
+
+
+def read_columnar(path, columns=None):
+    """Yield rows (lists) from a columnar export, optionally only the named `columns`."""
+    with open(path, "rb") as f:
+        f.seek(-len(MAGIC) - 4, 2)
+        size = _U32.unpack(f.read(4))[0]
+        if f.read() != MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        f.seek(-len(MAGIC) - 4 - size, 2)
+        footer = json.loads(f.read(size))
+        wanted = [footer["columns"].index(c) for c in columns] if columns else range(len(footer["columns"]))
+        for group in footer["row_groups"]:
+            cols = []
+            for i in wanted:
+                offset, length, encoding, typecode = group["columns"][i]
+                f.seek(offset)
+                cols.append(_decode_chunk(f.read(length), group["rows"], encoding, typecode))
+            yield from (list(r) for r in zip(*cols))
+
+
+def export_rows(path, columns, rows, fmt=None):
+    """Stream `rows` to `path` as CSV, JSONL or columnar (by extension if `fmt` is None); return the row count."""
+    fmt = fmt or format_for(path)
+    if fmt == "columnar":
+        with open(path, "wb") as f:
+            return write_columnar_rows(f, columns, rows)
+    with open(path, "w", newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        return (write_csv_rows if fmt == "csv" else write_jsonl_rows)(f, columns, rows)
+
+
+def export_view(view, path, query="", filters=None, sort=None, fmt=None):
+    """Export what a section view shows for `query`/`filters`/`sort` (a sort_rows() spec); return the row count."""
+    return export_rows(path, view.columns, view.iter_rows(query, filters, sort), fmt)
@@ -0,0 +1,140 @@
+"""Streaming bulk import of students from CSV or JSONL.
+
+Input is read and validated CHUNK_ROWS records at a time, column by column,
+against hash lookups built once per import (existing IDs, program codes and
+names), so memory stays bounded by the chunk size plus the roster itself.
+Validation runs outside the repository's write lock; each accepted chunk is
+then committed in its own Repository.batch() (a single journal append or
+SQLite transaction), so other desks' writes wait for one chunk at most,
+never for the whole file. The rejected records stream to a CSV reject
+report with their line and reason.
+"""
+import csv
+import json
+from itertools import islice
+
+from store import ID_PATTERN, YEAR_LEVELS, GENDERS, NOT_ENROLLED, STUDENT_HEADERS
+
+CHUNK_ROWS = 10_000
+REJECT_HEADERS = ["line", "reason"] + STUDENT_HEADERS
+
+
+def read_records(path):
+    """(line number, record dict) for each row of a .csv or .jsonl/.ndjson file, lazily.
+
+    A JSONL line that isn't a JSON object yields None as its record.
+    """
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path) as f:
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    try:
+                        record = json.loads(text)
+                    except ValueError:
+                        record = None
+                    yield line, record if isinstance(record, dict) else None
+        return
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield reader.line_num, record
+
+
+def _column(records, *names):
+    """One stripped string column across a chunk, taken from the first of `names` present."""
+    col = [r.get(names[0]) for r in records]
+    for n in names[1:]:
+        col = [r.get(n) if v is None else v for v, r in zip(col, records)]
+    return ["" if v is None else str(v).strip() for v in col]
+
+
+class StudentImporter:
+    """Validates and inserts student records chunk by chunk into `repo`."""
+
+    def __init__(self, repo, chunk_rows=CHUNK_ROWS):
+        self.repo = repo
+        self.chunk_rows = chunk_rows
+        self.programs = {"": "", NOT_ENROLLED.casefold(): ""}
+        for p in repo.programs:
+            self.programs[p["prog_code"].casefold()] = p["prog_code"]
+            self.programs.setdefault(p["name"].casefold(), p["prog_code"])
+        self.years = set(YEAR_LEVELS)
+        self.genders = {g.casefold(): g for g in GENDERS}
+
+    def validate(self, chunk):
+        """Split [(line, record)] into (rows to insert, [(line, reason, row)] rejects)."""
+        records = [r or {} for _, r in chunk]
+        ids = _column(records, "id")
+        firsts = [v.title() for v in _column(records, "firstname")]
+        lasts = [v.title() for v in _column(records, "lastname")]
+        progs = [self.programs.get(v.casefold()) for v in _column(records, "prog_code", "program")]
+        years = _column(records, "year")
+        genders = [self.genders.get(v.casefold()) for v in _column(records, "gender")]
+        existing, seen = self.repo.students.rows, set()
+        valid, rejects = [], []
+        for (line, raw), i, f, l, p, y, g in zip(chunk, ids, firsts, lasts, progs, years, genders):
+            row = {"id": i, "firstname": f, "lastname": l, "prog_code": p or "", "year": y, "gender": g or ""}
+            if raw is None: reason = "not a JSON object"
+            elif not ID_PATTERN.match(i): reason = "ID must follow format YYYY-NNNN"
+            elif i in existing: reason = "ID already exists"
+            elif i in seen: reason = "duplicate ID in file"
+            elif not (f and l): reason = "missing name"
+            elif y not in self.years: reason = f"year must be one of {', '.join(YEAR_LEVELS)}"
+            elif g is None: reason = f"gender must be one of {', '.join(GENDERS)}"
+            elif p is None: reason = "unknown program"
+            else:
+                seen.add(i)
+                valid.append(row)
+                continue
+            rejects.append((line, reason, row))
+        return valid, rejects
+
+    def add_chunk(self, chunk):
+        """Validate [(line, record)] and insert the valid rows in one batch; return (imported, rejects).
+
+        IDs another writer added since validation are rejected under the lock.
+        """
+        valid, rejects = self.validate(chunk)
+        if valid:
+            with self.repo.batch():
+                existing = self.repo.students.rows
+                taken = [r for r in valid if r["id"] in existing]
+                if taken:
+                    valid = [r for r in valid if r["id"] not in existing]
+                    lines = dict(zip(_column([r or {} for _, r in chunk], "id"), (line for line, _ in chunk)))
+                    rejects += [(lines.get(r["id"]), "ID already exists", r) for r in taken]
+                if valid:
+                    self.repo.insert_many("students", valid)
+        return len(valid), rejects
+
+    def run(self, path, rejects_path=None):
+        """Import `path`; return {"imported": n, "rejected": n}.
+
+        Each chunk commits on its own: an error stops the import, keeping
+        the chunks committed before it.
+        """
+        imported = rejected = 0
+        add_chunk = getattr(self.repo, "import_chunk", self.add_chunk)  # a RemoteRepository's service adds them
+        records = read_records(path)
+        report = open(rejects_path, "w", newline="") if rejects_path else None
+        try:
+            writer = csv.writer(report) if report else None
+            if writer:
+                writer.writerow(REJECT_HEADERS)
+            while True:
+                chunk = list(islice(records, self.chunk_rows))
+                if not chunk:
+                    break
+                added, rejects = add_chunk(chunk)
+                imported += added
+                rejected += len(rejects)
+                if writer:
+                    writer.writerows([line, reason] + [row[h] for h in STUDENT_HEADERS] for line, reason, row in rejects)
+        finally:
+            if report:
+                report.close()
+        return {"imported": imported, "rejected": rejected}
+
+
+def import_students(repo, path, rejects_path=None, chunk_rows=CHUNK_ROWS):
+    return StudentImporter(repo, chunk_rows).run(path, rejects_path)
@@ -1,37 +1,209 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import csv
 import os
-import re
- 
-import pathlib
-_BASE = pathlib.Path(__file__).parent
-STUDENT_CSV = str(_BASE / "student.csv")
-PROGRAM_CSV = str(_BASE / "program.csv")
-COLLEGE_CSV = str(_BASE / "college.csv")
- 
-def ensure_csv(file, headers):
-    if not os.path.exists(file):
-        with open(file, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
- 
-ensure_csv(STUDENT_CSV, ["id", "firstname", "lastname", "prog_code", "year", "gender"])
-ensure_csv(PROGRAM_CSV, ["prog_code", "name", "college_code"])
-ensure_csv(COLLEGE_CSV, ["college_code", "name"])
- 
-def read_csv(file):
-    try:
-        with open(file, newline="") as f:
-            return list(csv.DictReader(f))
-    except FileNotFoundError: return []
- 
-def write_csv(file, data, headers):
-    with open(file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(data)
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from concurrent.futures import ThreadPoolExecutor
+ 
+import profiling
+from autocomplete import OptionCache
+from exporter import export_view
+from remote import RemoteRepository, ServiceError
+from store import open_repository, ConflictError, ID_PATTERN, YEAR_LEVELS, GENDERS
+from views import make_views, Page, PAGE_SIZE, STUDENT_COLUMNS, PROGRAM_COLUMNS, COLLEGE_COLUMNS
+from watcher import create_watcher
+ 
+SEARCH_DEBOUNCE_MS = 250
+CHANGE_COALESCE_MS = 100
+POLL_INTERVAL_MS = 1500
+PERF_POLL_MS = 250
+PAGE_SIZES = ["50", "100", "500", "1000", "All"]
+OPTION_SOURCES = {
+    "genders": ((), lambda repo: GENDERS),
+    "years": ((), lambda repo: YEAR_LEVELS),
+    "programs": (("programs",), lambda repo: sorted({p["name"] for p in repo.programs})),
+    "enrollment": (("programs",), lambda repo: ["Not Enrolled"] + sorted(p["name"] for p in repo.programs)),
+    "colleges": (("colleges",), lambda repo: sorted({c["name"] for c in repo.colleges})),
+    "college_codes": (("colleges",), lambda repo: ["N/A"] + [f"{c['college_code']} - {c['name']}" for c in repo.colleges]),
+}
  
+class VirtualTable:
+    """A Treeview that only materializes the rows in view plus a small buffer.
+
+    All rows stay in the Python list `rows`; scrolling re-fills a fixed pool
+    of Tcl items, so memory and first paint don't grow with the row count.
+    In select mode a leading "Select" column shows whether each row's key
+    (its first column) is in `checked`, a set that outlives page turns and
+    re-sorts; `anchor` is the (key, position) of the last toggled row, where
+    a range check starts.
+    """
+    BUFFER = 10
+
+    def __init__(self, parent, columns, rows, select_mode=False):
+        self.columns = columns
+        self.rows = rows
+        self.select_mode = select_mode
+        self.checked = set()
+        self.anchor = None
+        self._positions = None
+        self.offset = 0
+        self.sorter = None
+        self.visible = 1
+        self.items = []
+        self._shown = {}
+        self.message = None
+        display_cols = ["Select"] + columns if select_mode else columns
+        self.tree = ttk.Treeview(parent, columns=display_cols, show="headings")
+        self.scroll = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.tree.bind("<Configure>", lambda e: self.render())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units") or "break")
+        self.tree.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units") or "break")
+        self.tree.bind("<Prior>", lambda e: self.yview("scroll", -1, "pages") or "break")
+        self.tree.bind("<Next>", lambda e: self.yview("scroll", 1, "pages") or "break")
+
+    def _on_wheel(self, event):
+        self.yview("scroll", -3 if event.delta > 0 else 3, "units")
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            self.offset += int(args[1]) * (self.visible if args[2] == "pages" else 1)
+        self.render()
+
+    def replace_rows(self, rows, keep_scroll=False):
+        """Swap in a new result set under the active sort and scroll back to the top (unless `keep_scroll`)."""
+        if self.sorter:
+            self.sorter(rows)
+        self.rows = rows
+        self._positions = None
+        if not keep_scroll: self.offset = 0
+        self.render()
+
+    def show_message(self, text):
+        """Overlay a centered note on the table, or remove it when `text` is falsy."""
+        if self.message is not None:
+            self.message.destroy(); self.message = None
+        if text:
+            self.message = tk.Frame(self.tree, bg="white")
+            self.message.place(relx=0.5, rely=0.4, anchor="center")
+            tk.Label(self.message, text=text, font=("Arial", 12, "italic"), fg="gray", bg="white").pack()
+
+    def sort_by(self, sorter):
+        """Sort the rows with `sorter` (sorts a list in place) and keep using it for later rows."""
+        self.sorter = sorter
+        if sorter:
+            sorter(self.rows)
+            self._positions = None
+        self.render()
+
+    @profiling.timed("ui.apply_diff")
+    def apply_diff(self, new_rows):
+        """Patch the rows from a fresh result set, matching rows by key (first column).
+
+        Existing rows keep their position, deleted ones drop out, new ones are
+        added at the end (or placed by the active sort), and the row at the
+        top of the viewport stays there. Returns (inserted, updated, deleted).
+        """
+        fresh = {r[0]: r for r in new_rows}
+        top = self.rows[self.offset][0] if self.offset < len(self.rows) else None
+        kept, updated = [], 0
+        for r in self.rows:
+            n = fresh.pop(r[0], None)
+            if n is None: continue
+            if n != r: updated += 1
+            kept.append(n)
+        deleted = len(self.rows) - len(kept)
+        self.rows = kept + list(fresh.values())
+        self._positions = None
+        if self.sorter:
+            self.sorter(self.rows)
+        keys = {r[0]: i for i, r in enumerate(self.rows)} if (deleted or fresh or self.sorter) else None
+        if keys is not None:
+            self.checked.intersection_update(keys)
+            if top in keys: self.offset = keys[top]
+        if fresh or updated or deleted:
+            self.render()
+        return len(fresh), updated, deleted
+
+    def values_for(self, row):
+        if self.select_mode:
+            return ["[X]" if row[0] in self.checked else "[ ]"] + list(row)
+        return row
+
+    def index_for(self, item):
+        """Position in `rows` of the row a Treeview item shows, or None."""
+        if item in self.items:
+            i = self.offset + self.items.index(item)
+            if i < len(self.rows):
+                return i
+        return None
+
+    def row_for(self, item):
+        """The data row currently shown by a Treeview item, or None."""
+        i = self.index_for(item)
+        return None if i is None else self.rows[i]
+
+    def toggle(self, i):
+        key = self.rows[i][0]
+        if key in self.checked: self.checked.discard(key)
+        else: self.checked.add(key)
+        self.anchor = (key, i)
+        self.render()
+
+    def _anchor_index(self):
+        """Position of the anchor row: where it was toggled if it is still there, else from a key map built once per row set."""
+        if self.anchor is None:
+            return None
+        key, i = self.anchor
+        if i < len(self.rows) and self.rows[i][0] == key:
+            return i
+        if self._positions is None:
+            self._positions = {r[0]: j for j, r in enumerate(self.rows)}
+        i = self._positions.get(key)
+        if i is not None:
+            self.anchor = (key, i)
+        return i
+
+    def check_range(self, i):
+        """Check every row from the anchor row through row `i` (just row `i` without an anchor in view)."""
+        start = self._anchor_index()
+        if start is None:
+            return self.toggle(i)
+        lo, hi = sorted((start, i))
+        self.checked.update(r[0] for r in self.rows[lo:hi + 1])
+        self.render()
+
+    def check_all(self, keys=None):
+        """Check `keys` (default: every row in the table); if all of them already are, uncheck them."""
+        keys = {r[0] for r in self.rows} if keys is None else set(keys)
+        if keys <= self.checked: self.checked -= keys
+        else: self.checked |= keys
+        self.render()
+
+    @profiling.timed("ui.render")
+    def render(self):
+        row_h = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        self.visible = max(1, (self.tree.winfo_height() - 25) // row_h)
+        total = len(self.rows)
+        self.offset = max(0, min(self.offset, total - self.visible))
+        window = self.rows[self.offset:self.offset + self.visible + self.BUFFER]
+        while len(self.items) > len(window):
+            item = self.items.pop()
+            self.tree.delete(item); self._shown.pop(item, None)
+        while len(self.items) < len(window):
+            self.items.append(self.tree.insert("", "end"))
+        for item, row in zip(self.items, window):
+            vals = tuple(str(v) for v in self.values_for(row))
+            if self._shown.get(item) != vals:
+                self.tree.item(item, values=vals); self._shown[item] = vals
+        self.tree.yview_moveto(0)
+        if total:
+            self.scroll.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+        else:
+            self.scroll.set(0, 1)
+
 class StudentDirectoryApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -40,18 +212,33 @@ class StudentDirectoryApp(tk.Tk):
         
         self.edit_mode = False
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", self.handle_empty_search)
+        self.search_var.trace_add("write", self.schedule_search)
+        self._search_after = None
+        self._search_gen = 0
+        self._search_future = None
+        self._search_pool = ThreadPoolExecutor(max_workers=1)
+        self._export_pool = ThreadPoolExecutor(max_workers=1)
+        self._refresh_pool = ThreadPoolExecutor(max_workers=1)
         
         self.active_filters = {"gender": [], "year": [], "program": [], "college": []}
+        self.sort_specs = {"Students": [], "Programs": [], "Colleges": []}
+        self.page_size = PAGE_SIZE
+        self.page = None
+        self._sort_extend = False
         self.filter_win = None
         self.add_popup_win = None 
         self.edit_popup_win = None
-        self._file_mtimes = {}
+        self.repo = open_repository()
+        self.views = make_views(self.repo)
+        self.option_cache = OptionCache(self.repo)
         self._auto_refresh_paused = False
+        self._watcher = None
+        self._change_after = None
+        self._bulk_undo = None
         self.sidebar = tk.Frame(self, bg="#d2b48c", width=180)
         self.sidebar.pack(side="left", fill="y", padx=10, pady=10)
         self.active_section = tk.StringVar(value="Students")
-        for section in ["Students", "Programs", "Colleges"]:
+        for section in ["Students", "Programs", "Colleges", "Statistics"]:
             tk.Radiobutton(self.sidebar, text=section, variable=self.active_section, value=section,
                 indicatoron=0, width=15, padx=10, pady=10, bg="#d2b48c", fg="white",
                 selectcolor="#8b4513", font=("Arial", 12), 
@@ -64,25 +251,97 @@ class StudentDirectoryApp(tk.Tk):
         self.edit_btn = tk.Button(self.button_container, text="📝", font=("Arial", 18), bg="#d2b48c", fg="white", command=self.toggle_edit_mode, bd=0, width=2)
         self.edit_btn.pack(side="left")
         self.bind_all("<Button-1>", self.check_filter_focus)
+        self.bind("<Control-z>", lambda e: self.undo_bulk_edit())
         self.center_window(1200, 600)
         self.switch_section("Students")
         self._start_auto_refresh()
+        if profiling.ENABLED: self._start_perf_overlay()
  
-    def handle_empty_search(self, *args):
-        if self.search_var.get() == "":
-            self.switch_section(self.active_section.get())
+    # ── Live search ───────────────────────────────────────────────────────────
+
+    def schedule_search(self, *args):
+        """Debounce keystrokes: run the query once typing pauses for SEARCH_DEBOUNCE_MS."""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def cancel_search(self):
+        if self._search_after is not None:
+            self.after_cancel(self._search_after); self._search_after = None
+        if self._search_future is not None:
+            self._search_future.cancel(); self._search_future = None
+        self._search_gen += 1
+
+    def run_search(self, cursor=None, direction="at", offset=None):
+        """Filter the current section (or fetch a page of it) on the worker thread; only the newest result is shown."""
+        self.cancel_search()
+        gen, section = self._search_gen, self.active_section.get()
+        query, filters = self.search_var.get(), {k: list(v) for k, v in self.active_filters.items()}
+        self._search_future = self._search_pool.submit(self.section_page, section, query, filters, cursor, direction, offset)
+        self.after(15, self._poll_search, gen, section, query, self._search_future)
+
+    def _poll_search(self, gen, section, query, future):
+        if gen != self._search_gen or future.cancelled():
+            return
+        if not future.done():
+            self.after(15, self._poll_search, gen, section, query, future); return
+        self._search_future = None
+        table = getattr(self, "table", None)
+        if table is None or self.table_section != section or not table.tree.winfo_exists():
+            return
+        self.page = future.result()
+        table.replace_rows(self.page.rows)
+        table.show_message("No search results found." if not self.page.rows and query.strip() else None)
+        self._show_page_info()
 
     def _start_auto_refresh(self):
-        """Poll CSV mtimes every 1500 ms and refresh the view if any changed."""
-        changed = False
-        for f in [STUDENT_CSV, PROGRAM_CSV, COLLEGE_CSV]:
+        """Refresh the view when the data files change on disk.
+
+        Uses inotify events delivered through Tk's file handler where
+        available; otherwise falls back to polling every POLL_INTERVAL_MS.
+        """
+        watcher = create_watcher(self.repo.backend.watch_paths())
+        if watcher is not None:
             try:
-                mtime = os.path.getmtime(f)
-            except FileNotFoundError:
-                mtime = 0
-            if self._file_mtimes.get(f) != mtime:
-                self._file_mtimes[f] = mtime
-                changed = True
+                self.tk.createfilehandler(watcher.fileno(), tk.READABLE, self._on_watch_event)
+            except (AttributeError, tk.TclError):
+                watcher.close(); watcher = None
+        self._watcher = watcher
+        if watcher is None:
+            self._poll_files()
+        else:
+            self.protocol("WM_DELETE_WINDOW", self._close)
+
+    def _on_watch_event(self, fd, mask):
+        # Bursts of events (a save is several writes plus a rename) collapse into one refresh.
+        if self._watcher.read() and self._change_after is None:
+            self._change_after = self.after(CHANGE_COALESCE_MS, self._apply_file_changes)
+
+    def _poll_files(self):
+        if isinstance(self.repo, RemoteRepository):
+            # Asking the service is a network round trip: keep it off the Tk thread.
+            self.after(15, self._poll_remote, self._refresh_pool.submit(self.repo.refresh)); return
+        try:
+            self._apply_file_changes()
+        finally:
+            self.after(POLL_INTERVAL_MS, self._poll_files)
+
+    def _poll_remote(self, future):
+        if not future.done():
+            self.after(15, self._poll_remote, future); return
+        try:
+            self._show_changes(future.result())
+        except ServiceError:
+            pass  # the service is unreachable for now; ask again on the next poll
+        finally:
+            self.after(POLL_INTERVAL_MS, self._poll_files)
+
+    def _apply_file_changes(self):
+        """Reload changed files and refresh the view unless a popup is open."""
+        self._change_after = None
+        self._show_changes(self.repo.refresh())
+
+    def _show_changes(self, changed):
         if changed and not self._auto_refresh_paused:
             popup_open = (
                 (self.add_popup_win and self.add_popup_win.winfo_exists()) or
@@ -90,10 +349,38 @@ class StudentDirectoryApp(tk.Tk):
                 (self.filter_win and self.filter_win.winfo_exists())
             )
             if not popup_open:
-                self.switch_section(self.active_section.get())
-        self.after(1500, self._start_auto_refresh)
+                self.refresh_view()
+
+    def _close(self):
+        if self._watcher is not None:
+            self.tk.deletefilehandler(self._watcher.fileno())
+            self._watcher.close()
+        self.destroy()
+ 
+    # ── Export ────────────────────────────────────────────────────────────────
+
+    def export_view(self, section):
+        """Stream the section as currently searched, filtered and sorted to a file, off the Tk thread."""
+        path = filedialog.asksaveasfilename(parent=self, title=f"Export {section}", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Columnar", "*.scol")])
+        if not path: return
+        filters = {k: list(v) for k, v in self.active_filters.items()} if section == "Students" else None
+        future = self._export_pool.submit(export_view, self.views[section], path, self.search_var.get(), filters, self.sort_specs[section])
+        self.export_btn.config(state="disabled", text="Exporting…")
+        self.after(50, self._poll_export, future, path)
+
+    def _poll_export(self, future, path):
+        if not future.done():
+            self.after(50, self._poll_export, future, path); return
+        if self.export_btn.winfo_exists(): self.export_btn.config(state="normal", text="Export")
+        try:
+            n = future.result()
+        except OSError as e:
+            messagebox.showerror("Export Failed", str(e)); return
+        messagebox.showinfo("Export", f"Exported {n} row(s) to {path}.")
  
     def toggle_edit_mode(self):
+        if self.active_section.get() not in self.views: return
         self.edit_mode = not self.edit_mode
         self.edit_btn.config(bg="#8b4513" if self.edit_mode else "#d2b48c")
         self.switch_section(self.active_section.get())
@@ -109,7 +396,8 @@ class StudentDirectoryApp(tk.Tk):
         x = (self.winfo_screenwidth() // 2) - (width // 2); y = (self.winfo_screenheight() // 2) - (height // 2)
         self.geometry(f"{width}x{height}+{x}+{y}")
  
-    def create_popup_dropdown(self, parent, label, options, is_filter=False, filter_key=None, refresh_callback=None, default_value=""):
+    def create_popup_dropdown(self, parent, label, options, is_filter=False, filter_key=None, refresh_callback=None, default_value="", counts=None):
+        """Entry with a drop-down of the best matches from `options` (a Completer) as the user types."""
         frame = tk.Frame(parent, bg="white")
         frame.pack(fill="x", pady=2)
         tk.Label(frame, text=label, font=("Arial", 8, "bold"), bg="white", fg="#555").pack(anchor="w")
@@ -117,30 +405,31 @@ class StudentDirectoryApp(tk.Tk):
         ent = tk.Entry(frame, textvariable=var, font=("Arial", 10), bg="#f4f4f4", bd=0)
         ent.pack(fill="x", ipady=3)
         drop_outer = tk.Frame(frame, bg="white", highlightbackground="#d2b48c", highlightthickness=1)
-        
-        canvas = tk.Canvas(drop_outer, bg="white", height=100 if is_filter else 80, highlightthickness=0)
-        scrollbar = tk.Scrollbar(drop_outer, orient="vertical", command=canvas.yview)
-        drop_inner = tk.Frame(canvas, bg="white")
-        canvas.configure(yscrollcommand=scrollbar.set); canvas.create_window((0, 0), window=drop_inner, anchor="nw")
+        visible = 5 if is_filter else 4
+        listbox = tk.Listbox(drop_outer, bg="white", bd=0, highlightthickness=0, font=("Arial", 8), activestyle="none",
+                             selectbackground="#8b4513", selectforeground="white", exportselection=False)
+        scrollbar = tk.Scrollbar(drop_outer, orient="vertical", command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set); listbox.pack(side="left", fill="both", expand=True)
         selected_val = {"val": default_value}; matches = []
  
         def update_results(*args):
             nonlocal matches
-            for child in drop_inner.winfo_children(): child.destroy()
-            query = var.get().lower()
-            matches = [o for o in options if query in o.lower() and (not is_filter or o not in self.pending_filters[filter_key])]
-            if matches:
-                drop_outer.pack(fill="x")
-                for i, m in enumerate(matches):
-                    bg_c = "#8b4513" if (i == 0 and query != "") else "white"
-                    fg_c = "white" if (i == 0 and query != "") else "black"
-                    tk.Button(drop_inner, text=m, anchor="w", bg=bg_c, fg=fg_c, relief="flat", font=("Arial", 8),
-                              command=lambda v=m: select_action(v)).pack(fill="x")
-                drop_inner.update_idletasks(); canvas.config(scrollregion=canvas.bbox("all"))
-                if len(matches) > 3: scrollbar.pack(side="right", fill="y")
-                else: scrollbar.pack_forget()
-                canvas.pack(side="left", fill="both", expand=True)
-            else: drop_outer.pack_forget()
+            query = var.get()
+            matches = options.matches(query, exclude=self.pending_filters[filter_key] if is_filter else ())
+            if not matches: drop_outer.pack_forget(); return
+            option_counts = counts() if counts else {}
+            listbox.delete(0, "end")
+            listbox.insert("end", *(f"{m} ({option_counts.get(m, 0)})" if counts else m for m in matches))
+            listbox.configure(height=min(len(matches), visible))
+            if query.strip(): listbox.selection_set(0)
+            if len(matches) > visible: scrollbar.pack(side="right", fill="y")
+            else: scrollbar.pack_forget()
+            drop_outer.pack(fill="x")
+ 
+        def move(step):
+            if not matches: return
+            cur = listbox.curselection(); i = max(0, min(len(matches) - 1, cur[0] + step if cur else 0))
+            listbox.selection_clear(0, "end"); listbox.selection_set(i); listbox.see(i)
  
         def select_action(v):
             if is_filter: self.pending_filters[filter_key].append(v); var.set(""); refresh_callback()
@@ -148,33 +437,82 @@ class StudentDirectoryApp(tk.Tk):
             drop_outer.pack_forget()
  
         var.trace_add("write", update_results); ent.bind("<FocusIn>", lambda e: update_results())
-        ent.bind("<Return>", lambda e: select_action(matches[0]) if matches else None)
+        ent.bind("<Down>", lambda e: move(1)); ent.bind("<Up>", lambda e: move(-1))
+        ent.bind("<Return>", lambda e: select_action(matches[(listbox.curselection() or (0,))[0]]) if matches else None)
+        listbox.bind("<ButtonRelease-1>", lambda e: select_action(matches[listbox.nearest(e.y)]) if matches else None)
         return selected_val, ent
  
+    def dropdown_options(self, source):
+        """The cached Completer for one of OPTION_SOURCES, rebuilt only after its tables change."""
+        tables, build = OPTION_SOURCES[source]
+        return self.option_cache.get(source, tables, lambda: build(self.repo))
+ 
     def switch_section(self, section):
         if section == "Students": self.show_students()
         elif section == "Programs": self.show_programs()
         elif section == "Colleges": self.show_colleges()
+        elif section == "Statistics": self.show_statistics()
+
+    @profiling.timed("ui.refresh_view")
+    def refresh_view(self):
+        """Patch the displayed table with rows changed on disk instead of rebuilding it.
+
+        Scroll position, checked rows and sort order are kept; only the
+        changed rows that are in view cost a Treeview update.
+        """
+        section = self.active_section.get()
+        if section not in self.views:
+            self.switch_section(section); return
+        page = self.section_page(section, cursor=self.page.first if self.page_size and self.page else None)
+        table = getattr(self, "table", None)
+        if table is None or self.table_section != section or not table.tree.winfo_exists() or not page.rows or not table.rows:
+            self.switch_section(section); return
+        self.page = page
+        if self.page_size:
+            table.replace_rows(page.rows, keep_scroll=True); self._show_page_info()
+        else:
+            table.apply_diff(page.rows)
  
-    def sort_column(self, col, reverse):
-        """Generic column sorting function for Treeview."""
-        data_list = [(self.tree.set(k, col), k) for k in self.tree.get_children("")]
-        
-        def natural_sort_key(item):
-            val = item[0]
-            if val.isdigit():
-                return (0, int(val))
-            return (1, val.lower())
+    @profiling.timed("ui.sort_column")
+    def sort_column(self, col):
+        """Header click: sort by `col`, or flip it if it is already the sort.
 
-        data_list.sort(key=natural_sort_key, reverse=reverse)
+        With Shift held the column is added to (or flipped within) the current
+        multi-column sort instead. The sort is kept per section, so it
+        survives refreshes, searches and section switches.
+        """
+        idx = self.table.columns.index(col)
+        section = self.table_section
+        spec = self.sort_specs[section]
+        pos = next((n for n, (i, _) in enumerate(spec) if i == idx), None)
+        if self._sort_extend:
+            spec = list(spec)
+            if pos is None: spec.append((idx, False))
+            else: spec[pos] = (idx, not spec[pos][1])
+        else:
+            spec = [(idx, not spec[pos][1] if pos is not None and len(spec) == 1 else False)]
+        self.sort_specs[section] = spec
+        self._show_sort_headings()
+        if self.page_size:
+            self.run_search()
+        else:
+            self.table.sort_by(self._sorter(section))
 
-        for index, (val, k) in enumerate(data_list):
-            self.tree.move(k, "", index)
+    def _sorter(self, section):
+        """In-table sort for the unpaged mode (pages come back already sorted)."""
+        spec, view = self.sort_specs[section], self.views[section]
+        return (lambda rows: view.sort_rows(rows, spec)) if spec and not self.page_size else None
 
-        # Reverse the sort tracking behavior for the next click
-        self.tree.heading(col, command=lambda _col=col: self.sort_column(_col, not reverse))
+    def _show_sort_headings(self):
+        """Mark sorted headings with ▲/▼ (and their precedence in a multi-column sort)."""
+        spec = self.sort_specs[self.table_section]
+        for n, col in enumerate(self.table.columns):
+            mark = next((("▼" if rev else "▲") + (str(k + 1) if len(spec) > 1 else "") for k, (i, rev) in enumerate(spec) if i == n), "")
+            self.tree.heading(col, text=f"{col} {mark}" if mark else col)
 
+    @profiling.timed("ui.display_table")
     def display_table(self, columns, rows, section_type):
+        self.cancel_search()
         for w in self.content_frame.winfo_children(): w.destroy()
         header = tk.Frame(self.content_frame, bg="white")
         header.pack(fill="x", pady=10)
@@ -182,11 +520,17 @@ class StudentDirectoryApp(tk.Tk):
         
         ctrls = tk.Frame(header, bg="white")
         ctrls.pack(side="right", padx=10)
+        self._build_pager(ctrls)
         
         if self.edit_mode:
+            self.selection_label = tk.Label(ctrls, font=("Arial", 9), bg="white", fg="#555")
+            self.selection_label.pack(side="left", padx=4)
+            tk.Button(ctrls, text="Select All", bg="#d2b48c", fg="white", command=self.select_all).pack(side="left", padx=2)
+            tk.Button(ctrls, text="Select Matching", bg="#d2b48c", fg="white", command=self.select_matching).pack(side="left", padx=2)
             tk.Button(ctrls, text="Delete Selected", bg="#ff4d4d", fg="white", command=lambda: self.delete_selected(section_type)).pack(side="left", padx=2)
             if section_type == "Students":
                 tk.Button(ctrls, text="Edit Selected", bg="#4CAF50", fg="white", command=self.edit_selected_student).pack(side="left", padx=2)
+                tk.Button(ctrls, text="Bulk Edit", bg="#4CAF50", fg="white", command=self.bulk_edit_students).pack(side="left", padx=2)
             elif section_type == "Programs":
                 tk.Button(ctrls, text="Edit Selected", bg="#4CAF50", fg="white", command=self.edit_selected_program).pack(side="left", padx=2)
             elif section_type == "Colleges":
@@ -195,72 +539,119 @@ class StudentDirectoryApp(tk.Tk):
         else:
             s_ent = tk.Entry(ctrls, textvariable=self.search_var, font=("Arial", 10), width=25, bg="#f4f4f4", bd=0)
             s_ent.pack(side="left", padx=5, ipady=3)
-            s_ent.bind("<Return>", lambda e: self.switch_section(section_type))
-            tk.Button(ctrls, text="Search", bg="#d2b48c", fg="white", command=lambda: self.switch_section(section_type)).pack(side="left", padx=2)
+            s_ent.bind("<Return>", lambda e: self.run_search())
+            tk.Button(ctrls, text="Search", bg="#d2b48c", fg="white", command=self.run_search).pack(side="left", padx=2)
             
             if section_type == "Students":
                 sort_btn = tk.Button(ctrls, text="Filters ▽", bg="#8b4513", fg="white", padx=12, command=lambda: self.show_filter_menu(sort_btn))
                 sort_btn.pack(side="left", padx=2)
+            self.export_btn = tk.Button(ctrls, text="Export", bg="#d2b48c", fg="white", command=lambda: self.export_view(section_type))
+            self.export_btn.pack(side="left", padx=2)
+        if section_type == "Students" and self._bulk_undo:
+            tk.Button(ctrls, text="Undo Bulk Edit", bg="gray", fg="white", command=self.undo_bulk_edit).pack(side="left", padx=2)
  
-        display_cols = ["Select"] + columns if self.edit_mode else columns
-        self.tree = ttk.Treeview(self.content_frame, columns=display_cols, show="headings")
+        self.table = VirtualTable(self.content_frame, columns, rows, select_mode=self.edit_mode)
+        self.table_section = section_type
+        self.tree = self.table.tree
+        self.tree.bind("<ButtonPress-1>", lambda e: setattr(self, "_sort_extend", bool(e.state & 0x0001)), add="+")
         
         for col in self.tree["columns"]: 
             if col == "Select":
-                self.tree.heading(col, text=col)
+                self.tree.heading(col, text=col, command=self.select_all)
                 self.tree.column(col, width=50, minwidth=50, anchor="center", stretch=False)
             else:
-                self.tree.heading(col, text=col, command=lambda _col=col: self.sort_column(_col, False))
+                self.tree.heading(col, text=col, command=lambda _col=col: self.sort_column(_col))
                 self.tree.column(col, width=100, minwidth=80, anchor="center", stretch=True)
+        self._show_sort_headings()
+        sorter = self._sorter(section_type)
+        if sorter:
+            self.table.sorter = sorter; sorter(self.table.rows)
         
-        tree_scroll = ttk.Scrollbar(self.content_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=tree_scroll.set)
-        
-        tree_scroll.pack(side="right", fill="y")
+        self.table.scroll.pack(side="right", fill="y")
         self.tree.pack(fill="both", expand=True)
         
         if rows:
-            for r in rows: self.tree.insert("", "end", values=(["[ ]"] + r if self.edit_mode else r))
+            self.table.render()
         elif self.search_var.get().strip() != "":
-            no_res_frame = tk.Frame(self.tree, bg="white")
-            no_res_frame.place(relx=0.5, rely=0.4, anchor="center")
-            tk.Label(no_res_frame, text="No search results found.", font=("Arial", 12, "italic"), fg="gray", bg="white").pack()
-        if self.edit_mode: self.tree.bind("<ButtonRelease-1>", self.on_tree_click)
+            self.table.show_message("No search results found.")
+        if self.edit_mode: self.tree.bind("<ButtonRelease-1>", self.on_tree_click); self._show_selection()
  
     def show_students(self):
-        d = read_csv(STUDENT_CSV); p_map = {p["prog_code"]: p for p in read_csv(PROGRAM_CSV)}
-        c_map = {c["college_code"]: c["name"] for c in read_csv(COLLEGE_CSV)}
-        def _prog(s): return p_map.get(s["prog_code"], {}).get("name", "Not Enrolled") if s["prog_code"] else "Not Enrolled"
-        def _coll(s): return c_map.get(p_map.get(s["prog_code"], {}).get("college_code"), "N/A") if s["prog_code"] else "N/A"
-        def _pcode(s): return s["prog_code"] if s["prog_code"] else "N/A"
-        def _ccode(s): return p_map.get(s["prog_code"], {}).get("college_code", "N/A") if s["prog_code"] else "N/A"
-        
-        rows = [[s["id"], f"{s['lastname']}, {s['firstname']}", s["gender"], s["year"], _pcode(s), _prog(s), _ccode(s), _coll(s)] for s in d]
-        q = self.search_var.get().lower()
-        fdata = [r for r in rows if (not q or any(q in str(c).lower() for c in r)) and \
-                 (not self.active_filters["gender"] or r[2] in self.active_filters["gender"]) and \
-                 (not self.active_filters["year"] or str(r[3]) in self.active_filters["year"]) and \
-                 (not self.active_filters["program"] or r[5] in self.active_filters["program"]) and \
-                 (not self.active_filters["college"] or r[7] in self.active_filters["college"])]
-        self.display_table(["ID", "Name", "Gender", "Year", "Program Code", "Program Name", "College Code", "College Name"], fdata, "Students")
+        self.page = self.section_page("Students")
+        self.display_table(STUDENT_COLUMNS, self.page.rows, "Students")
+ 
+    def section_page(self, section, query=None, filters=None, cursor=None, direction="at", offset=None):
+        """A Page of a section (every row when paging is off); safe to call off the Tk thread when query and filters are given."""
+        if query is None: query = self.search_var.get()
+        if section != "Students": filters = None
+        elif filters is None: filters = self.active_filters
+        view = self.views[section]
+        if not self.page_size:
+            rows = view.search(query, filters)
+            return Page(rows, len(rows), 0, None, None)
+        return view.page(query, filters, self.sort_specs[section], self.page_size, cursor, direction, offset)
  
     def show_programs(self):
-        d = read_csv(PROGRAM_CSV); c_map = {c["college_code"]: c["name"] for c in read_csv(COLLEGE_CSV)}
-        rows = [[p["prog_code"], p["name"], p["college_code"], c_map.get(p["college_code"], "N/A")] for p in d]
-        q = self.search_var.get().lower()
-        fdata = [r for r in rows if not q or any(q in str(c).lower() for c in r)]
-        self.display_table(["Code", "Program Name", "College Code", "College Name"], fdata, "Programs")
+        self.page = self.section_page("Programs")
+        self.display_table(PROGRAM_COLUMNS, self.page.rows, "Programs")
  
     def show_colleges(self):
-        d = read_csv(COLLEGE_CSV); rows = [[c["college_code"], c["name"]] for c in d]
-        q = self.search_var.get().lower()
-        fdata = [r for r in rows if not q or any(q in str(c).lower() for c in r)]
-        self.display_table(["Code", "College Name"], fdata, "Colleges")
+        self.page = self.section_page("Colleges")
+        self.display_table(COLLEGE_COLUMNS, self.page.rows, "Colleges")
+ 
+    # ── Paging ────────────────────────────────────────────────────────────────
+
+    def _build_pager(self, parent):
+        """◀ [page] of N ▶ plus the page-size menu ("All" turns paging off)."""
+        pager = tk.Frame(parent, bg="white")
+        pager.pack(side="left", padx=8)
+        self.page_var = tk.StringVar()
+        self.page_label = None
+        if self.page_size:
+            tk.Button(pager, text="◀", bg="#d2b48c", fg="white", bd=0, width=2, command=lambda: self.turn_page("prev")).pack(side="left")
+            ent = tk.Entry(pager, textvariable=self.page_var, font=("Arial", 10), width=5, justify="center", bg="#f4f4f4", bd=0)
+            ent.pack(side="left", padx=2, ipady=3)
+            ent.bind("<Return>", lambda e: self.jump_to_page())
+            self.page_label = tk.Label(pager, font=("Arial", 9), bg="white", fg="#555")
+            self.page_label.pack(side="left", padx=2)
+            tk.Button(pager, text="▶", bg="#d2b48c", fg="white", bd=0, width=2, command=lambda: self.turn_page("next")).pack(side="left")
+        size_var = tk.StringVar(value=str(self.page_size or "All"))
+        menu = tk.OptionMenu(pager, size_var, *PAGE_SIZES, command=self.set_page_size)
+        menu.config(bg="white", bd=0, highlightthickness=0, font=("Arial", 9))
+        menu.pack(side="left", padx=2)
+        self._show_page_info()
+
+    def _show_page_info(self):
+        if not (self.page_label and self.page_label.winfo_exists() and self.page):
+            return
+        pages = max(1, -(-self.page.total // self.page_size))
+        current = (self.page.offset + max(len(self.page.rows), 1) - 1) // self.page_size + 1
+        self.page_var.set(str(current))
+        self.page_label.config(text=f"of {pages}  ({self.page.total} rows)")
+
+    def turn_page(self, direction):
+        page = self.page
+        if not page or not page.rows: return
+        if direction == "next" and page.offset + len(page.rows) >= page.total: return
+        if direction == "prev" and page.offset == 0: return
+        self.run_search(page.last if direction == "next" else page.first, direction)
+
+    def jump_to_page(self):
+        try:
+            n = int(self.page_var.get())
+        except ValueError:
+            self._show_page_info(); return
+        self.run_search(offset=max(0, n - 1) * self.page_size)
+
+    def set_page_size(self, value):
+        self.page_size = None if value == "All" else int(value)
+        self.switch_section(self.active_section.get())
  
     def add_entry_popup(self):
         if self.add_popup_win and self.add_popup_win.winfo_exists():
             self.add_popup_win.lift()
             return
+        if self.active_section.get() not in self.views: return
         self.add_popup_win = tk.Toplevel(self)
         current = self.active_section.get()
         self.add_popup_win.title(f"Add {current}")
@@ -277,17 +668,17 @@ class StudentDirectoryApp(tk.Tk):
             fn_ent = tk.Entry(container, bg="#f4f4f4", bd=0); fn_ent.pack(fill="x", pady=5, ipady=3)
             tk.Label(container, text="Last Name", bg="white", font=("Arial", 8, "bold")).pack(anchor="w")
             ln_ent = tk.Entry(container, bg="#f4f4f4", bd=0); ln_ent.pack(fill="x", pady=5, ipady=3)
-            all_programs = read_csv(PROGRAM_CSV); prog_names = ["Not Enrolled"] + sorted([p['name'] for p in all_programs])
-            prog_sel, _ = self.create_popup_dropdown(container, "Program", prog_names)
-            year_sel, _ = self.create_popup_dropdown(container, "Year Level", ["1", "2", "3", "4", "5"])
-            gen_sel, _ = self.create_popup_dropdown(container, "Gender", ["Male", "Female", "Other"])
+            all_programs = list(self.repo.programs)
+            prog_sel, _ = self.create_popup_dropdown(container, "Program", self.dropdown_options("enrollment"))
+            year_sel, _ = self.create_popup_dropdown(container, "Year Level", self.dropdown_options("years"))
+            gen_sel, _ = self.create_popup_dropdown(container, "Gender", self.dropdown_options("genders"))
             def save():
                 err_msg.pack_forget()
                 raw_id = id_ent.get().strip()
-                if not re.match(r"^\d{4}-\d{4}$", raw_id):
+                if not ID_PATTERN.match(raw_id):
                     err_msg.pack(anchor="e"); return
-                existing_ids = [s["id"] for s in read_csv(STUDENT_CSV)]
-                if raw_id in existing_ids:
+                self.repo.refresh()
+                if raw_id in self.repo.students:
                     messagebox.showerror("Error", f"Student ID {raw_id} already exists.")
                     return
                 p_name = prog_sel["val"]
@@ -295,16 +686,19 @@ class StudentDirectoryApp(tk.Tk):
                 fn = fn_ent.get().title(); ln = ln_ent.get().title()
                 yr = year_sel["val"]; gn = gen_sel["val"]
                 if not all([fn, ln, yr, gn]): return messagebox.showwarning("!", "Fill all fields")
-                data = read_csv(STUDENT_CSV); data.append({"id": raw_id, "firstname": fn, "lastname": ln, "prog_code": p_code, "year": yr, "gender": gn})
-                write_csv(STUDENT_CSV, data, ["id", "firstname", "lastname", "prog_code", "year", "gender"]); self.show_students(); self.add_popup_win.destroy()
+                try:
+                    self.repo.insert("students", {"id": raw_id, "firstname": fn, "lastname": ln, "prog_code": p_code, "year": yr, "gender": gn})
+                except KeyError:  # another desk added it since the check above
+                    messagebox.showerror("Error", f"Student ID {raw_id} already exists.")
+                    return
+                self.show_students(); self.add_popup_win.destroy()
             tk.Button(container, text="SAVE", bg="#8b4513", fg="white", font=("Arial", 10, "bold"), command=save).pack(pady=20)
         elif current == "Programs":
             tk.Label(container, text="Code", bg="white", font=("Arial", 8, "bold")).pack(anchor="w")
             c_ent = tk.Entry(container, bg="#f4f4f4", bd=0); c_ent.pack(fill="x", pady=5, ipady=3)
             tk.Label(container, text="Name", bg="white", font=("Arial", 8, "bold")).pack(anchor="w")
             n_ent = tk.Entry(container, bg="#f4f4f4", bd=0); n_ent.pack(fill="x", pady=5, ipady=3)
-            college_opts = ["N/A"] + [f"{c['college_code']} - {c['name']}" for c in read_csv(COLLEGE_CSV)]
-            coll_sel, _ = self.create_popup_dropdown(container, "College", college_opts)
+            coll_sel, _ = self.create_popup_dropdown(container, "College", self.dropdown_options("college_codes"))
             def save_p():
                 code = c_ent.get().strip().upper()
                 name = n_ent.get().strip().title()
@@ -316,12 +710,16 @@ class StudentDirectoryApp(tk.Tk):
                 if not raw_coll:
                     messagebox.showwarning("!", "Please select a College (choose N/A if unaffiliated)")
                     return
-                data = read_csv(PROGRAM_CSV)
-                if any(p["prog_code"] == code for p in data):
+                self.repo.refresh()
+                if code in self.repo.programs:
+                    messagebox.showerror("Error", f"Program code '{code}' already exists.")
+                    return
+                try:
+                    self.repo.insert("programs", {"prog_code": code, "name": name, "college_code": cc})
+                except KeyError:
                     messagebox.showerror("Error", f"Program code '{code}' already exists.")
                     return
-                data.append({"prog_code": code, "name": name, "college_code": cc})
-                write_csv(PROGRAM_CSV, data, ["prog_code", "name", "college_code"]); self.show_programs(); self.add_popup_win.destroy()
+                self.show_programs(); self.add_popup_win.destroy()
             tk.Button(container, text="SAVE", bg="#8b4513", fg="white", font=("Arial", 10, "bold"), command=save_p).pack(pady=20)
         elif current == "Colleges":
             tk.Label(container, text="Code", bg="white", font=("Arial", 8, "bold")).pack(anchor="w")
@@ -334,27 +732,29 @@ class StudentDirectoryApp(tk.Tk):
                 if not all([code, name]):
                     messagebox.showwarning("!", "Fill all fields")
                     return
-                data = read_csv(COLLEGE_CSV)
-                if any(c["college_code"] == code for c in data):
+                self.repo.refresh()
+                if code in self.repo.colleges:
                     messagebox.showerror("Error", f"College code '{code}' already exists.")
                     return
-                data.append({"college_code": code, "name": name})
-                write_csv(COLLEGE_CSV, data, ["college_code", "name"]); self.show_colleges(); self.add_popup_win.destroy()
+                try:
+                    self.repo.insert("colleges", {"college_code": code, "name": name})
+                except KeyError:
+                    messagebox.showerror("Error", f"College code '{code}' already exists.")
+                    return
+                self.show_colleges(); self.add_popup_win.destroy()
             tk.Button(container, text="SAVE", bg="#8b4513", fg="white", font=("Arial", 10, "bold"), command=save_c).pack(pady=20)
  
     # ── Students ──────────────────────────────────────────────────────────────
 
     def edit_selected_student(self):
-        selected_items = [item for item in self.tree.get_children() 
-                         if self.tree.item(item, "values")[0] == "[X]"]
+        selected_items = list(self.table.checked)
         if not selected_items:
             messagebox.showwarning("Warning", "Please select a student to edit.")
             return
         if len(selected_items) > 1:
-            messagebox.showwarning("Warning", "Please select only one student to edit.")
-            return
-        student_id = self.tree.item(selected_items[0], "values")[1]
-        student_data = next((s for s in read_csv(STUDENT_CSV) if s["id"] == student_id), None)
+            return self.bulk_edit_students()
+        student_id = selected_items[0]
+        student_data = self.repo.students.get(student_id)
         if not student_data:
             messagebox.showerror("Error", "Student data not found.")
             return
@@ -384,12 +784,13 @@ class StudentDirectoryApp(tk.Tk):
         tk.Label(container, text="Last Name", bg="white", font=("Arial", 8, "bold")).pack(anchor="w")
         ln_ent = tk.Entry(container, bg="#f4f4f4", bd=0); ln_ent.pack(fill="x", pady=5, ipady=3); ln_ent.insert(0, student_data["lastname"])
 
-        all_programs = read_csv(PROGRAM_CSV); prog_names = ["Not Enrolled"] + sorted([p['name'] for p in all_programs])
+        all_programs = list(self.repo.programs)
         current_prog_name = next((p['name'] for p in all_programs if p['prog_code'] == student_data["prog_code"]), "Not Enrolled")
-        prog_sel, _ = self.create_popup_dropdown(container, "Program", prog_names, default_value=current_prog_name)
-        year_sel, _ = self.create_popup_dropdown(container, "Year Level", ["1", "2", "3", "4", "5"], default_value=student_data["year"])
-        gen_sel, _ = self.create_popup_dropdown(container, "Gender", ["Male", "Female", "Other"], default_value=student_data["gender"])
+        prog_sel, _ = self.create_popup_dropdown(container, "Program", self.dropdown_options("enrollment"), default_value=current_prog_name)
+        year_sel, _ = self.create_popup_dropdown(container, "Year Level", self.dropdown_options("years"), default_value=student_data["year"])
+        gen_sel, _ = self.create_popup_dropdown(container, "Gender", self.dropdown_options("genders"), default_value=student_data["gender"])
         btn_frame = tk.Frame(container, bg="white"); btn_frame.pack(pady=20)
+        stamp = self.repo.stamp("students", student_data["id"])
 
         def save_changes():
             id_err.config(text="")
@@ -398,7 +799,7 @@ class StudentDirectoryApp(tk.Tk):
             new_lastname = ln_ent.get().title().strip()
             new_gender = gen_sel["val"]; new_year = year_sel["val"]; new_prog_name = prog_sel["val"]
 
-            if not re.match(r"^\d{4}-\d{4}$", new_id):
+            if not ID_PATTERN.match(new_id):
                 id_err.config(text="ID must follow format YYYY-NNNN (e.g. 2024-0001)"); return
 
             if not all([new_firstname, new_lastname, new_gender, new_year]):
@@ -408,35 +809,111 @@ class StudentDirectoryApp(tk.Tk):
 
             new_prog_code = "" if new_prog_name == "Not Enrolled" else next((p['prog_code'] for p in all_programs if p['name'] == new_prog_name), "")
 
-            students_data = read_csv(STUDENT_CSV)
+            self.repo.refresh()
             old_id = student_data["id"]
 
             if new_id != old_id:
-                if any(s["id"] == new_id for s in students_data):
+                if new_id in self.repo.students:
                     id_err.config(text=f"ID '{new_id}' already exists."); return
 
-            for i, s in enumerate(students_data):
-                if s["id"] == old_id:
-                    students_data[i] = {"id": new_id, "firstname": new_firstname, "lastname": new_lastname,
-                                        "prog_code": new_prog_code, "year": new_year, "gender": new_gender}; break
-            write_csv(STUDENT_CSV, students_data, ["id", "firstname", "lastname", "prog_code", "year", "gender"])
+            try:
+                self.repo.update("students", old_id, {"id": new_id, "firstname": new_firstname, "lastname": new_lastname,
+                                                      "prog_code": new_prog_code, "year": new_year, "gender": new_gender}, expected=stamp)
+            except ConflictError:
+                return self.edit_conflict("student", self.show_students)
+            except KeyError:  # taken by another desk since the check above
+                id_err.config(text=f"ID '{new_id}' already exists."); return
             self.show_students(); self.edit_popup_win.destroy()
             messagebox.showinfo("Success", "Student information updated successfully!")
 
         tk.Button(btn_frame, text="SAVE CHANGES", bg="#8b4513", fg="white", font=("Arial", 10, "bold"), command=save_changes).pack(side="left", padx=5)
         tk.Button(btn_frame, text="CANCEL", bg="gray", fg="white", font=("Arial", 10, "bold"), command=self.edit_popup_win.destroy).pack(side="left", padx=5)
 
+    def bulk_edit_students(self):
+        """Set program, year and/or gender on every checked student (or, with none checked, every match) at once."""
+        if self.edit_popup_win and self.edit_popup_win.winfo_exists():
+            self.edit_popup_win.lift(); return
+        if self.table.checked:
+            keys, target = list(self.table.checked), "checked"
+        else:
+            keys, target = list(self.views["Students"].keys_matching(self.search_var.get(), self.active_filters)), "matching the search and filters"
+        if not keys:
+            messagebox.showwarning("Warning", "No students to edit."); return
+        self.edit_popup_win = tk.Toplevel(self)
+        self.edit_popup_win.title("Bulk Edit Students")
+        self.edit_popup_win.configure(bg="white")
+        self.edit_popup_win.transient(self)
+        self.edit_popup_win.grab_set()
+        self.center_window_small(self.edit_popup_win, 400, 520)
+        container = tk.Frame(self.edit_popup_win, bg="white", padx=20, pady=20)
+        container.pack(fill="both", expand=True)
+        tk.Label(container, text=f"{len(keys)} student(s) {target}", bg="white", font=("Arial", 10, "bold"), fg="#8b4513").pack(anchor="w")
+        tk.Label(container, text="Leave a field blank to keep each student's current value.", bg="white", font=("Arial", 8, "italic"), fg="#555").pack(anchor="w", pady=(0, 10))
+        prog_sel, _ = self.create_popup_dropdown(container, "Program", self.dropdown_options("enrollment"))
+        year_sel, _ = self.create_popup_dropdown(container, "Year Level", self.dropdown_options("years"))
+        gen_sel, _ = self.create_popup_dropdown(container, "Gender", self.dropdown_options("genders"))
+        preview = tk.Label(container, text="", bg="white", font=("Arial", 9), fg="#555", justify="left")
+        preview.pack(anchor="w", pady=(10, 0))
+
+        def changes():
+            out = {c: v for c, v in (("year", year_sel["val"]), ("gender", gen_sel["val"])) if v}
+            if prog_sel["val"]:
+                code = self.repo.resolve_program(prog_sel["val"])
+                out["prog_code"] = prog_sel["val"] if code is None else code
+            return out
+
+        def check():
+            self.repo.refresh()
+            change = changes()
+            error = self.repo.assign_error("students", change)
+            if error:
+                preview.config(text=error, fg="red"); return None
+            count = self.repo.assign_preview("students", keys, change)
+            preview.config(text=f"{count} of {len(keys)} student(s) will change.", fg="#555")
+            return change, count
+
+        def apply():
+            checked = check()
+            if checked is None: return
+            change, count = checked
+            if not count:
+                messagebox.showinfo("Bulk Edit", "Those students already have these values.", parent=self.edit_popup_win); return
+            if not messagebox.askyesno("Confirm", f"Change {count} student(s)? This can be undone.", parent=self.edit_popup_win): return
+            try:
+                undo = self.repo.assign("students", keys, change)
+            except ValueError as e:
+                preview.config(text=str(e), fg="red"); return
+            self._bulk_undo = ("students", undo)
+            self.edit_popup_win.destroy(); self.show_students()
+            messagebox.showinfo("Success", f"Updated {len(undo)} student(s). Use Undo Bulk Edit (Ctrl+Z) to revert.")
+
+        btn_frame = tk.Frame(container, bg="white"); btn_frame.pack(pady=20)
+        tk.Button(btn_frame, text="PREVIEW", bg="#d2b48c", fg="white", font=("Arial", 10, "bold"), command=check).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="APPLY", bg="#8b4513", fg="white", font=("Arial", 10, "bold"), command=apply).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="CANCEL", bg="gray", fg="white", font=("Arial", 10, "bold"), command=self.edit_popup_win.destroy).pack(side="left", padx=5)
+ 
+    def undo_bulk_edit(self):
+        """Revert the last bulk edit, except on students someone has changed since."""
+        if not self._bulk_undo: return
+        name, undo = self._bulk_undo
+        if not messagebox.askyesno("Undo Bulk Edit", f"Revert the last bulk edit of {len(undo)} student(s)?"): return
+        restored, skipped = self.repo.undo_assign(name, undo)
+        self._bulk_undo = None
+        if self.active_section.get() == "Students": self.show_students()
+        msg = f"Restored {restored} student(s)."
+        if skipped: msg += f"\n{skipped} changed again since the bulk edit were left as they are."
+        messagebox.showinfo("Undo Bulk Edit", msg)
+
     # ── Programs ──────────────────────────────────────────────────────────────
 
     def edit_selected_program(self):
-        selected_items = [item for item in self.tree.get_children()
-                          if self.tree.item(item, "values")[0] == "[X]"]
+        selected_items = list(self.table.checked)
         if not selected_items:
             messagebox.showwarning("Warning", "Please select a program to edit."); return
         if len(selected_items) > 1:
             messagebox.showwarning("Warning", "Please select only one program to edit."); return
-        prog_code = self.tree.item(selected_items[0], "values")[1]
-        prog_data = next((p for p in read_csv(PROGRAM_CSV) if p["prog_code"] == prog_code), None)
+        prog_code = selected_items[0]
+        prog_data = self.repo.programs.get(prog_code)
         if not prog_data:
             messagebox.showerror("Error", "Program data not found."); return
         self.open_edit_program_popup(prog_data)
@@ -465,13 +942,12 @@ class StudentDirectoryApp(tk.Tk):
         name_ent.pack(fill="x", pady=5, ipady=3)
         name_ent.insert(0, prog_data["name"])
 
-        all_colleges = read_csv(COLLEGE_CSV)
-        college_options = ["N/A"] + [f"{c['college_code']} - {c['name']}" for c in all_colleges]
-        current_college_opt = next(
-            (f"{c['college_code']} - {c['name']}" for c in all_colleges if c["college_code"] == prog_data["college_code"]), "N/A")
-        coll_sel, _ = self.create_popup_dropdown(container, "College", college_options, default_value=current_college_opt)
+        college = self.repo.colleges.get(prog_data["college_code"])
+        current_college_opt = f"{college['college_code']} - {college['name']}" if college else "N/A"
+        coll_sel, _ = self.create_popup_dropdown(container, "College", self.dropdown_options("college_codes"), default_value=current_college_opt)
 
         btn_frame = tk.Frame(container, bg="white"); btn_frame.pack(pady=20)
+        stamp = self.repo.stamp("programs", prog_data["prog_code"])
 
         def save_changes():
             code_err.config(text="")
@@ -488,23 +964,18 @@ class StudentDirectoryApp(tk.Tk):
                 messagebox.showwarning("Warning", "Please select a College (choose N/A if unaffiliated)."); return
 
             old_code = prog_data["prog_code"]
-            programs = read_csv(PROGRAM_CSV)
+            self.repo.refresh()
 
             if new_code != old_code:
-                if any(p["prog_code"] == new_code for p in programs):
+                if new_code in self.repo.programs:
                     code_err.config(text=f"Program code '{new_code}' already exists."); return
 
-            for i, p in enumerate(programs):
-                if p["prog_code"] == old_code:
-                    programs[i] = {"prog_code": new_code, "name": new_name, "college_code": new_college_code}; break
-            write_csv(PROGRAM_CSV, programs, ["prog_code", "name", "college_code"])
-
-            if new_code != old_code:
-                students = read_csv(STUDENT_CSV)
-                for i, s in enumerate(students):
-                    if s["prog_code"] == old_code:
-                        students[i]["prog_code"] = new_code
-                write_csv(STUDENT_CSV, students, ["id", "firstname", "lastname", "prog_code", "year", "gender"])
+            try:
+                self.repo.update_cascade("programs", old_code, {"prog_code": new_code, "name": new_name, "college_code": new_college_code}, expected=stamp)
+            except ConflictError:
+                return self.edit_conflict("program", self.show_programs)
+            except KeyError:
+                code_err.config(text=f"Program code '{new_code}' already exists."); return
 
             self.show_programs()
             self.edit_popup_win.destroy()
@@ -518,14 +989,13 @@ class StudentDirectoryApp(tk.Tk):
     # ── Colleges ──────────────────────────────────────────────────────────────
 
     def edit_selected_college(self):
-        selected_items = [item for item in self.tree.get_children()
-                          if self.tree.item(item, "values")[0] == "[X]"]
+        selected_items = list(self.table.checked)
         if not selected_items:
             messagebox.showwarning("Warning", "Please select a college to edit."); return
         if len(selected_items) > 1:
             messagebox.showwarning("Warning", "Please select only one college to edit."); return
-        college_code = self.tree.item(selected_items[0], "values")[1]
-        college_data = next((c for c in read_csv(COLLEGE_CSV) if c["college_code"] == college_code), None)
+        college_code = selected_items[0]
+        college_data = self.repo.colleges.get(college_code)
         if not college_data:
             messagebox.showerror("Error", "College data not found."); return
         self.open_edit_college_popup(college_data)
@@ -555,6 +1025,7 @@ class StudentDirectoryApp(tk.Tk):
         name_ent.insert(0, college_data["name"])
 
         btn_frame = tk.Frame(container, bg="white"); btn_frame.pack(pady=20)
+        stamp = self.repo.stamp("colleges", college_data["college_code"])
 
         def save_changes():
             code_err.config(text="")
@@ -567,35 +1038,26 @@ class StudentDirectoryApp(tk.Tk):
                 messagebox.showwarning("Warning", "College name cannot be empty."); return
 
             old_code = college_data["college_code"]
-            colleges = read_csv(COLLEGE_CSV)
+            self.repo.refresh()
 
             if new_code != old_code:
-                if any(c["college_code"] == new_code for c in colleges):
+                if new_code in self.repo.colleges:
                     code_err.config(text=f"College code '{new_code}' already exists."); return
 
-            for i, c in enumerate(colleges):
-                if c["college_code"] == old_code:
-                    colleges[i] = {"college_code": new_code, "name": new_name}; break
-            write_csv(COLLEGE_CSV, colleges, ["college_code", "name"])
-
-            if new_code != old_code:
-                programs = read_csv(PROGRAM_CSV)
-                for i, p in enumerate(programs):
-                    if p["college_code"] == old_code:
-                        programs[i]["college_code"] = new_code
-                write_csv(PROGRAM_CSV, programs, ["prog_code", "name", "college_code"])
-
-            programs_now = read_csv(PROGRAM_CSV)
-            affected_prog_codes = [p["prog_code"] for p in programs_now if p["college_code"] == new_code]
-            students = read_csv(STUDENT_CSV)
-            affected_students = sum(1 for s in students if s["prog_code"] in affected_prog_codes)
+            try:
+                self.repo.update_cascade("colleges", old_code, {"college_code": new_code, "name": new_name}, expected=stamp)
+            except ConflictError:
+                return self.edit_conflict("college", self.show_colleges)
+            except KeyError:
+                code_err.config(text=f"College code '{new_code}' already exists."); return
+            affected_programs, affected_students = self.repo.cascade_counts("colleges", [new_code])
 
             self.show_colleges()
             self.edit_popup_win.destroy()
             messagebox.showinfo(
                 "Success",
                 f"College updated successfully!\n"
-                f"{len(affected_prog_codes)} program(s) and {affected_students} student(s) "
+                f"{affected_programs} program(s) and {affected_students} student(s) "
                 f"reflect the changes automatically."
             )
 
@@ -604,6 +1066,82 @@ class StudentDirectoryApp(tk.Tk):
         tk.Button(btn_frame, text="CANCEL", bg="gray", fg="white",
                   font=("Arial", 10, "bold"), command=self.edit_popup_win.destroy).pack(side="left", padx=5)
 
+    def edit_conflict(self, kind, show):
+        """Another workstation saved the row being edited first: drop this edit and show theirs."""
+        self.edit_popup_win.destroy(); show()
+        messagebox.showwarning("Changed Elsewhere", f"This {kind} was changed or deleted at another workstation while you were editing.\n"
+                               "Your changes were not saved; reopen it to see the current details.")
+
+    # ── Statistics ────────────────────────────────────────────────────────────
+
+    def show_statistics(self):
+        """Enrollment counts from the repository's running counters; no pass over the students."""
+        self.cancel_search()
+        for w in self.content_frame.winfo_children(): w.destroy()
+        self.table, self.table_section = None, "Statistics"
+        stats = self.repo.enrollment()
+        total = stats["students"]
+        header = tk.Frame(self.content_frame, bg="white")
+        header.pack(fill="x", pady=10)
+        tk.Label(header, text="Statistics", font=("Arial", 16, "bold"), bg="white", fg="#8b4513").pack(side="left", padx=10)
+        tk.Label(header, text=f"{total} students · {stats['programs']} programs · {stats['colleges']} colleges · {stats['not_enrolled']} not enrolled",
+                 font=("Arial", 10), bg="white", fg="#555").pack(side="right", padx=10)
+        grid = tk.Frame(self.content_frame, bg="white")
+        grid.pack(fill="both", expand=True)
+        panels = [("Year Level", [(f"Year {y}", n) for y, n in sorted(stats["year"].items())]),
+                  ("Gender", sorted(stats["gender"].items())),
+                  ("Program", [(f"{code} - {name}", n) for code, name, n in stats["program"]] + [("Not Enrolled", stats["not_enrolled"])]),
+                  ("College", [(f"{code} - {name}", n) for code, name, n in stats["college"]])]
+        for i, (title, items) in enumerate(panels):
+            self._stat_panel(grid, title, items, total).grid(row=i // 2, column=i % 2, sticky="nsew", padx=5, pady=5)
+        grid.columnconfigure(0, weight=1); grid.columnconfigure(1, weight=1); grid.rowconfigure(1, weight=1)
+ 
+    def _stat_panel(self, parent, title, items, total):
+        frame = tk.Frame(parent, bg="white")
+        tk.Label(frame, text=title, font=("Arial", 11, "bold"), bg="white", fg="#8b4513").pack(anchor="w")
+        tree = ttk.Treeview(frame, columns=("Group", "Students", "Share"), show="headings", height=min(max(len(items), 1), 8))
+        for col, width, anchor in (("Group", 220, "w"), ("Students", 70, "e"), ("Share", 150, "w")):
+            tree.heading(col, text=col); tree.column(col, width=width, minwidth=50, anchor=anchor, stretch=col == "Group")
+        for label, n in items:
+            share = n / total if total else 0
+            tree.insert("", "end", values=(label, n, f"{'█' * round(share * 20)} {share:.0%}"))
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y"); tree.pack(fill="both", expand=True)
+        return frame
+ 
+    # ── Profiling ─────────────────────────────────────────────────────────────
+
+    def _start_perf_overlay(self):
+        """With SSIS_PROFILE set: the last timed operation in the corner, F9 to dump the histograms, F10 to start/stop cProfile."""
+        self._perf_label = tk.Label(self, font=("Courier", 9), bg="#222", fg="#9f9", padx=6, pady=2)
+        self._perf_label.place(relx=0.0, rely=1.0, anchor="sw")
+        self._perf_last = None
+        self.bind("<F9>", lambda e: self.dump_profile())
+        self.bind("<F10>", lambda e: self.toggle_cprofile())
+        self._poll_perf()
+ 
+    def _poll_perf(self):
+        last = profiling.last
+        if last is not None and last is not self._perf_last:
+            self._perf_last = last
+            name, seconds, rows = last
+            self._perf_label.config(text=f"{name} {seconds * 1e3:.1f} ms" + (f" · {rows} rows" if rows is not None else "")
+                                    + ("  [cProfile]" if profiling.profiling_active() else ""))
+        self.after(PERF_POLL_MS, self._poll_perf)
+ 
+    def dump_profile(self):
+        path = profiling.dump_json(os.environ.get("SSIS_PROFILE_OUT") or "ssis-profile.json")
+        messagebox.showinfo("Profile", f"Timing histograms written to {os.path.abspath(path)}")
+ 
+    def toggle_cprofile(self):
+        if not profiling.profiling_active():
+            profiling.start_profile()
+            self._perf_label.config(text="cProfile recording… (F10 to stop)")
+            return
+        path = profiling.stop_profile("ssis-profile.prof")
+        messagebox.showinfo("Profile", f"cProfile stats written to {os.path.abspath(path)}\n(python -m pstats {path})")
+ 
     # ── Filter / misc ─────────────────────────────────────────────────────────
 
     def show_filter_menu(self, widget):
@@ -626,7 +1164,9 @@ class StudentDirectoryApp(tk.Tk):
         c_area = tk.Frame(scroll_cont, bg="white"); c_area.pack(fill="x", padx=5)
         tag_canvas = tk.Canvas(scroll_cont, bg="#f9f9f9", height=0, highlightthickness=0); tag_frame = tk.Frame(tag_canvas, bg="#f9f9f9")
         cl_btn_cont = tk.Frame(scroll_cont, bg="white")
+        facet_counts = {}
         def refresh_tags():
+            facet_counts.update(self.views["Students"].facet_counts(self.search_var.get(), self.pending_filters))
             for c in tag_frame.winfo_children(): c.destroy()
             total_tags = sum(len(v) for v in self.pending_filters.values())
             [w.destroy() for w in cl_btn_cont.winfo_children()]
@@ -644,10 +1184,10 @@ class StudentDirectoryApp(tk.Tk):
             else: 
                 tag_canvas.pack_forget(); cl_btn_cont.pack_forget()
             tag_canvas.create_window((0, 0), window=tag_frame, anchor="nw"); tag_canvas.config(scrollregion=tag_canvas.bbox("all"))
-        self.create_popup_dropdown(c_area, "Gender", ["Male", "Female", "Other"], True, "gender", refresh_tags)
-        self.create_popup_dropdown(c_area, "Year Level", ["1", "2", "3", "4", "5"], True, "year", refresh_tags)
-        self.create_popup_dropdown(c_area, "Program", sorted(list(set(p["name"] for p in read_csv(PROGRAM_CSV)))), True, "program", refresh_tags)
-        self.create_popup_dropdown(c_area, "College", sorted(list(set(c["name"] for c in read_csv(COLLEGE_CSV)))), True, "college", refresh_tags)
+        def counts_for(key): return lambda: facet_counts.get(key, {})
+        for label, source, key in (("Gender", "genders", "gender"), ("Year Level", "years", "year"),
+                                   ("Program", "programs", "program"), ("College", "colleges", "college")):
+            self.create_popup_dropdown(c_area, label, self.dropdown_options(source), True, key, refresh_tags, counts=counts_for(key))
         refresh_tags()
  
     def center_window_small(self, win, w, h):
@@ -660,57 +1200,54 @@ class StudentDirectoryApp(tk.Tk):
             if not (fx <= x <= fx + fw and fy <= y <= fy + fh): 
                 self.filter_win.destroy(); self.filter_win = None
  
+    # ── Selection ─────────────────────────────────────────────────────────────
+
     def on_tree_click(self, event):
-        item = self.tree.identify_row(event.y)
-        if item:
-            vals = list(self.tree.item(item, "values")); vals[0] = "[X]" if vals[0] == "[ ]" else "[ ]"
-            self.tree.item(item, values=vals)
- 
+        """Click toggles a row; Shift+click checks the rows from the last toggled one to this one."""
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return
+        i = self.table.index_for(self.tree.identify_row(event.y))
+        if i is None:
+            return
+        if event.state & 0x0001: self.table.check_range(i)
+        else: self.table.toggle(i)
+        self._show_selection()
+
+    def select_all(self):
+        """Check (or, if all are checked, uncheck) every row on the current page."""
+        self.table.check_all(); self._show_selection()
+
+    def select_matching(self):
+        """Check (or uncheck) every row matching the search and filters, on all pages."""
+        view = self.views[self.table_section]
+        filters = self.active_filters if self.table_section == "Students" else None
+        self.table.check_all(view.keys_matching(self.search_var.get(), filters)); self._show_selection()
+
+    def _show_selection(self):
+        label = getattr(self, "selection_label", None)
+        if label is not None and label.winfo_exists():
+            label.config(text=f"{len(self.table.checked)} selected" if self.table.checked else "")
+
     def delete_selected(self, section):
-        fn, pk = {"Students": (STUDENT_CSV, "id"), "Programs": (PROGRAM_CSV, "prog_code"), "Colleges": (COLLEGE_CSV, "college_code")}[section]
-        head = {"Students": ["id", "firstname", "lastname", "prog_code", "year", "gender"], "Programs": ["prog_code", "name", "college_code"], "Colleges": ["college_code", "name"]}[section]
-        data = read_csv(fn)
-        to_del = [self.tree.item(i, "values")[1] for i in self.tree.get_children() if self.tree.item(i, "values")[0] == "[X]"]
+        name = {"Students": "students", "Programs": "programs", "Colleges": "colleges"}[section]
+        self.repo.refresh()
+        to_del = self.repo.existing(name, self.table.checked)
         if not to_del:
             return
 
         confirm_msg = f"Delete {len(to_del)} item(s)?"
+        affected_progs, affected_studs = self.repo.cascade_counts(name, to_del)
         if section == "Programs":
-            students = read_csv(STUDENT_CSV)
-            affected = sum(1 for s in students if s["prog_code"] in to_del)
-            if affected:
-                confirm_msg += f"\n\n{affected} student(s) enrolled in these programs will be marked as Not Enrolled."
+            if affected_studs:
+                confirm_msg += f"\n\n{affected_studs} student(s) enrolled in these programs will be marked as Not Enrolled."
         elif section == "Colleges":
-            programs = read_csv(PROGRAM_CSV)
-            affected_progs = [p["prog_code"] for p in programs if p["college_code"] in to_del]
-            students = read_csv(STUDENT_CSV)
-            affected_studs = sum(1 for s in students if s["prog_code"] in affected_progs)
             if affected_progs or affected_studs:
-                confirm_msg += f"\n\n{len(affected_progs)} program(s) under these colleges will also be deleted, and {affected_studs} student(s) will be marked as Not Enrolled."
+                confirm_msg += f"\n\n{affected_progs} program(s) under these colleges will also be deleted, and {affected_studs} student(s) will be marked as Not Enrolled."
 
         if not messagebox.askyesno("Confirm", confirm_msg):
             return
 
-        write_csv(fn, [r for r in data if r[pk] not in to_del], head)
-
-        if section == "Programs":
-            students = read_csv(STUDENT_CSV)
-            for i, s in enumerate(students):
-                if s["prog_code"] in to_del:
-                    students[i]["prog_code"] = ""
-            write_csv(STUDENT_CSV, students, ["id", "firstname", "lastname", "prog_code", "year", "gender"])
-
-        elif section == "Colleges":
-            programs = read_csv(PROGRAM_CSV)
-            deleted_prog_codes = [p["prog_code"] for p in programs if p["college_code"] in to_del]
-            remaining_programs = [p for p in programs if p["college_code"] not in to_del]
-            write_csv(PROGRAM_CSV, remaining_programs, ["prog_code", "name", "college_code"])
-            if deleted_prog_codes:
-                students = read_csv(STUDENT_CSV)
-                for i, s in enumerate(students):
-                    if s["prog_code"] in deleted_prog_codes:
-                        students[i]["prog_code"] = ""
-                write_csv(STUDENT_CSV, students, ["id", "firstname", "lastname", "prog_code", "year", "gender"])
+        self.repo.delete_cascade(name, to_del)
 
         self.switch_section(section)
  
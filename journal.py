@@ -0,0 +1,273 @@
+"""Write-ahead journal for the CSV backend.
+
+The CSV files are a checkpoint; every committed change since then lives in
+the journal, one JSON object per line:
+
+    {"generation": G}                   first line, new after every compaction
+    {"begin": N}                        transaction N starts
+    {"seq": N, "op": [table, kind, ...]}
+    {"commit": N, "tables": [...]}      transaction N is durable
+    {"tx": N, "tables": [...], "ops": [...]}   a small transaction in one line
+    {"compact": [[tmp, path], ...]}     checkpoint in progress
+
+A transaction is appended and fsynced as a whole before the in-memory change
+is considered saved, so a crash loses at most the transaction being
+written: on open, a torn last line or a transaction without its commit line
+is cut off (rolled back). Compaction writes the full tables to temp files,
+fsyncs them, logs the compact record, renames them over the CSVs and only
+then starts a fresh journal; finding a compact record as the last line on
+open means that sequence was interrupted, so it is rolled forward.
+
+Several processes may share the files: writers hold an advisory fcntl
+lock while they append or compact, and every process follows the others'
+commits with `tail()`.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from itertools import chain, islice
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; elsewhere writers go unlocked
+    fcntl = None
+
+COMPACT_BYTES = 8 << 20
+OP_ROWS = 10_000
+TX_OPS = 16
+
+
+def _fresh(path):
+    """Atomically replace the journal at `path` with an empty one; return its generation."""
+    generation = time.time_ns()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(json.dumps({"generation": generation}) + "\n")
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return generation
+
+
+def apply(table, kind, *args):
+    """Replay one journaled operation onto a store.Table."""
+    if kind == "insert":
+        for values in args[0]:
+            row = table.conform(dict(zip(table.headers, values)))
+            if row[table.pk] in table.rows: table.replace(row[table.pk], row)
+            else: table.add(row)
+    elif kind == "update":
+        key, row = args[0], table.conform(dict(zip(table.headers, args[1])))
+        if key in table.rows: table.replace(key, row)
+        elif row[table.pk] in table.rows: table.replace(row[table.pk], row)
+        else: table.add(row)
+    elif kind == "delete":
+        table.discard(args[0])
+    elif kind == "reassign":
+        column, old_values, new_value = args[0], set(args[1]), args[2]
+        hits = table.referencing(old_values) if column == table.ref else [k for k, r in table.rows.items() if r[column] in old_values]
+        if hits: table.set_value(hits, column, new_value)
+    elif kind == "assign":
+        keys = [k for k in args[0] if k in table.rows]
+        if keys: table.assign(keys, args[1])
+    else:
+        raise ValueError(f"unknown journal operation {kind!r}")
+
+
+class Journal:
+    """The journal file at `path`, recovered on open and followed by `tail()`.
+
+    `touched[table]` is the last committed transaction that changed a table
+    (what the backend folds into its signature) and `offset` the end of the
+    last committed record read or written. Writers serialize on `locked()`,
+    an exclusive fcntl lock on `<path>.lock` (no locking where fcntl is
+    unavailable); readers never take it, they only ever use committed
+    records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.generation = None
+        self.offset = 0
+        self.seq = 0
+        self.touched = {}
+        self.interrupted = None
+        self._ino = None
+        self._lock_file = None
+        self._lock_depth = 0
+        with self.locked():
+            self.recover()
+
+    @contextmanager
+    def locked(self):
+        """Hold the exclusive write lock (re-entrant within this object)."""
+        if self._lock_depth == 0 and fcntl is not None:
+            self._lock_file = open(self.lock_path, "a")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0 and self._lock_file is not None:
+                self._lock_file.close(); self._lock_file = None
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+
+    def _scan(self, f, offset):
+        """Parse complete lines from `offset`; yield (record, end offset) until a torn line."""
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            offset += len(line)
+            yield record, offset
+
+    def recover(self):
+        """Cut off a torn tail or uncommitted transaction, finish an interrupted compaction."""
+        try:
+            f = open(self.path, "rb+")
+        except FileNotFoundError:
+            self.generation, self.seq, self.touched = _fresh(self.path), 0, {}
+            self.offset, self.interrupted = os.path.getsize(self.path), None
+            return
+        with f:
+            generation, good, begun, last, seq, touched = None, 0, None, None, 0, {}
+            for record, end in self._scan(f, 0):
+                last = record
+                if generation is None:
+                    if "generation" not in record: break
+                    generation, good = record["generation"], end
+                elif "begin" in record:
+                    begun = good
+                elif "commit" in record or "tx" in record:
+                    seq, begun, good = record.get("commit", record.get("tx")), None, end
+                    touched.update(dict.fromkeys(record["tables"], seq))
+                elif "compact" in record:
+                    good = end; break
+            if generation is not None and not (last and "compact" in last):
+                f.truncate(good if begun is None else begun)
+        if generation is None:
+            self.generation, self.seq, self.touched = _fresh(self.path), 0, {}
+        elif last and "compact" in last:
+            self.finish_compaction(last["compact"])
+        else:
+            self.generation, self.seq, self.touched = generation, seq, touched
+        self.offset, self.interrupted = os.path.getsize(self.path), None
+
+    def tail(self):
+        """Transactions committed (by any process) since the last look, as [(seq, ops)].
+
+        None means the journal was compacted and restarted since, so the data
+        files changed too and incremental catch-up is not possible. A compact
+        record is not read past; it is left in `interrupted` for the next
+        writer to finish under the lock.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            st = os.fstat(f.fileno())
+            if (st.st_ino, st.st_size) == (self._ino, self.offset):
+                return []
+            self._ino = st.st_ino
+            try:
+                generation = json.loads(f.readline())["generation"]
+            except (ValueError, KeyError, TypeError):
+                return []
+            reset = generation != self.generation
+            if reset:
+                self.generation, self.offset, self.seq, self.touched = generation, f.tell(), 0, {}
+            commits, pending = [], {}
+            for record, end in self._scan(f, self.offset):
+                if "op" in record:
+                    pending.setdefault(record["seq"], []).append(record["op"])
+                elif "commit" in record or "tx" in record:
+                    seq = record.get("commit", record.get("tx"))
+                    self.seq, self.offset = seq, end
+                    self.touched.update(dict.fromkeys(record["tables"], seq))
+                    commits.append((seq, record["ops"] if "tx" in record else pending.pop(seq, [])))
+                elif "compact" in record:
+                    self.interrupted = record["compact"]
+                    break
+            return None if reset else commits
+
+    def operations(self, table, generation=None):
+        """The committed operations on `table`, oldest first, as [kind, *args] lists.
+
+        With `generation`, None is returned if the journal no longer belongs
+        to it (a compaction started or finished), so the caller can retry.
+        """
+        committed, pending = [], {}
+        try:
+            with open(self.path, "rb") as f:
+                for record, end in self._scan(f, 0):
+                    if end > self.offset:
+                        break
+                    if "generation" in record and generation is not None and record["generation"] != generation:
+                        return None
+                    if "op" in record and record["op"][0] == table:
+                        pending.setdefault(record["seq"], []).append(record["op"][1:])
+                    elif "commit" in record:
+                        committed += pending.pop(record["commit"], [])
+                    elif "tx" in record:
+                        committed += [op[1:] for op in record["ops"] if op[0] == table]
+                    elif "compact" in record:
+                        return None
+        except FileNotFoundError:
+            pass
+        return committed
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+
+    def append(self, ops):
+        """Durably log one transaction of (table, kind, *args) operations; return its number.
+
+        Anything after the last committed record (the remains of a writer
+        that died mid-transaction) is cut off first.
+        """
+        with self.locked():
+            self.tail()
+            seq = self.seq + 1
+            tables = []
+            with open(self.path, "rb+") as f:
+                f.seek(self.offset); f.truncate()
+                ops = iter(ops)
+                head = list(islice(ops, TX_OPS + 1))
+                if len(head) <= TX_OPS:
+                    tables = list(dict.fromkeys(op[0] for op in head))
+                    f.write(json.dumps({"tx": seq, "tables": tables, "ops": head}, separators=(",", ":")).encode() + b"\n")
+                else:
+                    f.write(json.dumps({"begin": seq}).encode() + b"\n")
+                    for op in chain(head, ops):
+                        if op[0] not in tables: tables.append(op[0])
+                        f.write(json.dumps({"seq": seq, "op": op}, separators=(",", ":")).encode() + b"\n")
+                    f.write(json.dumps({"commit": seq, "tables": tables}).encode() + b"\n")
+                f.flush(); os.fsync(f.fileno())
+                self.offset = f.tell()
+            self.seq = seq
+            self.touched.update(dict.fromkeys(tables, seq))
+            return seq
+
+    def compact(self, temps):
+        """Checkpoint: `temps` are [(fsynced temp file, data file)] holding the full tables."""
+        with self.locked():
+            self.tail()
+            with open(self.path, "rb+") as f:
+                f.seek(self.offset); f.truncate()
+                f.write(json.dumps({"compact": temps}).encode() + b"\n")
+                f.flush(); os.fsync(f.fileno())
+            self.finish_compaction(temps)
+            self.offset, self.interrupted = os.path.getsize(self.path), None
+
+    def finish_compaction(self, temps):
+        for tmp, path in temps:
+            if os.path.exists(tmp):
+                os.replace(tmp, path)
+        self.generation, self.seq, self.touched = _fresh(self.path), 0, {}
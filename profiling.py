@@ -0,0 +1,173 @@
+"""Opt-in timing of the hot paths, to see where the time goes.
+
+Set SSIS_PROFILE=1 before starting the app, the CLI or the service. The
+instrumented operations (table loads, journal replay and writes, CSV
+checkpoints, view joins, searches, sorts and pages, Treeview renders) are
+then timed into one latency histogram per operation, with the rows each
+call handled. With it unset, `timed` hands back the function untouched and
+`span` returns a shared no-op, so the instrumentation costs next to
+nothing.
+
+`dump_json(path)` writes the histograms; `start_profile()` and
+`stop_profile(path)` record a cProfile of everything in between, in
+pstats format. If SSIS_PROFILE_OUT is set, the histograms are also written
+there on exit.
+"""
+import atexit
+import cProfile
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+ENABLED = os.environ.get("SSIS_PROFILE", "") not in ("", "0")
+BUCKETS = 24  # bucket i counts calls under 2**i microseconds; the last one also the slower ones
+
+
+class Histogram:
+    """Call count, total and max time, rows handled, and log2 latency buckets of one operation."""
+    __slots__ = ("count", "total", "max", "rows", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds, rows=None):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows or 0
+        self.buckets[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, p):
+        """Upper bound, in ms, of the bucket holding the `p` quantile (capped at the max seen)."""
+        seen, want = 0, p * self.count
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= want:
+                return min(2 ** i / 1e3, self.max * 1e3)
+        return self.max * 1e3
+
+    def summary(self):
+        return {"count": self.count, "rows": self.rows, "total_ms": round(self.total * 1e3, 3),
+                "mean_ms": round(self.total * 1e3 / self.count, 3) if self.count else 0.0,
+                "p50_ms": round(self.percentile(0.5), 3), "p90_ms": round(self.percentile(0.9), 3),
+                "p99_ms": round(self.percentile(0.99), 3), "max_ms": round(self.max * 1e3, 3),
+                "buckets_us": {f"<{2 ** i}": n for i, n in enumerate(self.buckets) if n}}
+
+
+_histograms = {}
+_lock = threading.Lock()
+_profiler = None
+last = None  # (operation, seconds, rows) of the latest timed call, for the app's overlay
+
+
+def record(name, seconds, rows=None):
+    global last
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = Histogram()
+        h.add(seconds, rows)
+    last = (name, seconds, rows)
+
+
+class _Span:
+    __slots__ = ("name", "rows", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start, self.rows)
+
+
+class _Off:
+    """The span handed out while profiling is off: does nothing, accepts `rows`."""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_OFF = _Off()
+
+
+def span(name):
+    """Context manager timing its block under `name`; set `.rows` on it to record a row count."""
+    return _Span(name) if ENABLED else _OFF
+
+
+def timed(name):
+    """Decorator timing every call under `name` (the function itself when profiling is off)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """{operation: summary} for every operation timed so far."""
+    with _lock:
+        return {name: h.summary() for name, h in sorted(_histograms.items())}
+
+
+def reset():
+    global last
+    with _lock:
+        _histograms.clear()
+    last = None
+
+
+def dump_json(path):
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+def profiling_active():
+    return _profiler is not None
+
+
+def start_profile():
+    """Start recording a cProfile (of the calling thread) until stop_profile()."""
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop_profile(path):
+    """Stop the cProfile started by start_profile() and write its stats to `path`."""
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    profiler.dump_stats(path)
+    return path
+
+
+if ENABLED and os.environ.get("SSIS_PROFILE_OUT"):
+    atexit.register(dump_json, os.environ["SSIS_PROFILE_OUT"])
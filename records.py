@@ -0,0 +1,113 @@
+"""Compact row records for the in-memory tables.
+
+A plain dict per row costs a hash table per student; these records keep the
+columns in __slots__ instead, intern the strings that repeat across rows
+(codes and names), and store year level and gender as small-int codes.
+Records read like the dicts they replace (`row["year"]`, `row.get(...)`,
+`dict(row)`) but are never changed in place: `replace()` returns a copy.
+"""
+import sys
+import threading
+from collections.abc import Mapping
+
+_intern = sys.intern
+
+
+class Codebook:
+    """Small-int codes for a column with few distinct values; unseen values get the next code.
+
+    Known values are looked up without locking; a new one is added under a
+    lock, since rows are built on several threads (the service's workers).
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+        self._lock = threading.Lock()
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    self.values.append(value)
+                    code = self.codes[value] = len(self.values) - 1
+        return code
+
+
+YEARS = Codebook()
+GENDERS = Codebook()
+
+
+class Record(Mapping):
+    """Read-only, dict-like view of one table row stored in slots."""
+    __slots__ = ()
+    fields = ()
+
+    @classmethod
+    def from_mapping(cls, row):
+        """A record from any mapping; missing or empty columns become ""."""
+        if type(row) is cls:
+            return row
+        return cls(*[row.get(f) or "" for f in cls.fields])
+
+    def replace(self, **changes):
+        return self.from_mapping({**self, **changes})
+
+    def __getitem__(self, name):
+        if name in self.fields:
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class StudentRecord(Record):
+    __slots__ = ("id", "firstname", "lastname", "prog_code", "_year", "_gender")
+    fields = ("id", "firstname", "lastname", "prog_code", "year", "gender")
+
+    def __init__(self, id, firstname, lastname, prog_code, year, gender):
+        self.id = id
+        self.firstname = _intern(firstname)
+        self.lastname = _intern(lastname)
+        self.prog_code = _intern(prog_code)
+        self._year = YEARS.encode(year)
+        self._gender = GENDERS.encode(gender)
+
+    @property
+    def year(self):
+        return YEARS.values[self._year]
+
+    @property
+    def gender(self):
+        return GENDERS.values[self._gender]
+
+
+class ProgramRecord(Record):
+    __slots__ = ("prog_code", "name", "college_code")
+    fields = ("prog_code", "name", "college_code")
+
+    def __init__(self, prog_code, name, college_code):
+        self.prog_code = _intern(prog_code)
+        self.name = name
+        self.college_code = _intern(college_code)
+
+
+class CollegeRecord(Record):
+    __slots__ = ("college_code", "name")
+    fields = ("college_code", "name")
+
+    def __init__(self, college_code, name):
+        self.college_code = _intern(college_code)
+        self.name = name
+
+
+RECORD_TYPES = {"students": StudentRecord, "programs": ProgramRecord, "colleges": CollegeRecord}
@@ -0,0 +1,242 @@
+"""The SSIS service (server.py) as a Repository, for desks started with SSIS_SERVER.
+
+RemoteRepository answers the calls the app and the CLI make on a
+Repository by asking the service: lookups, stamps and edits go over HTTP
+and fail the same way (KeyError for a duplicate key, ConflictError for a
+stale stamp), and `make_views()` gives views whose searches and pages are
+run by the service's warm indexes. `refresh()` compares the service's
+version, so the app's polling picks up every desk's edits. Each thread
+keeps its own persistent connection.
+"""
+import json
+import select
+import threading
+from http.client import HTTPConnection, HTTPException
+from urllib.parse import urlsplit, urlencode, quote
+
+from store import ConflictError
+from views import natural_key, Page, PAGE_SIZE, STUDENT_COLUMNS, PROGRAM_COLUMNS, COLLEGE_COLUMNS
+
+TIMEOUT = 30
+
+
+def _closed(conn):
+    """True if the service has closed (or written out of turn on) an idle kept connection."""
+    return conn.sock is not None and bool(select.select([conn.sock], [], [], 0)[0])
+
+
+class ServiceError(Exception):
+    """The service rejected a request (bad input) or could not be reached."""
+
+
+class _NoFiles:
+    """Backend stand-in: there are no local files to watch, so the app polls refresh()."""
+
+    def watch_paths(self):
+        return []
+
+
+class RemoteTable:
+    """One service table, read through on demand: get(), `in`, iteration and len()."""
+
+    def __init__(self, repo, name):
+        self.repo = repo
+        self.name = name
+
+    def get(self, key, default=None):
+        found = self.repo.call("GET", f"/api/{self.name}/{quote(key, safe='')}")
+        return default if found is None else found["row"]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        cached = self.repo._rows.get(self.name)
+        if cached is None or cached[0] != self.repo.version:
+            cached = self.repo._rows[self.name] = (self.repo.version, self.repo.call("GET", f"/api/{self.name}")["rows"])
+        return iter(cached[1])
+
+    def __len__(self):
+        return self.repo.call("GET", "/api/stats")[self.name]
+
+    def changes_since(self, mark):
+        # Nothing finer than the service version is known here (enough for OptionCache).
+        return None, (self.repo.version, 0)
+
+
+class RemoteRepository:
+    """The Repository calls the app and CLI make, answered by the service at `url`."""
+
+    def __init__(self, url, timeout=TIMEOUT):
+        parts = urlsplit(url if "//" in url else f"http://{url}")
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.backend = _NoFiles()
+        self.students = RemoteTable(self, "students")
+        self.programs = RemoteTable(self, "programs")
+        self.colleges = RemoteTable(self, "colleges")
+        self.tables = {t.name: t for t in (self.students, self.programs, self.colleges)}
+        self.version = None
+        self._local = threading.local()
+        self._rows = {}
+        self.refresh()
+
+    def call(self, method, path, params=None, body=None):
+        """Send one request; the decoded reply, or None for 404. Errors map to the Repository's."""
+        if params:
+            path += "?" + urlencode(params)
+        data = None if body is None else json.dumps(body).encode()
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        while True:
+            conn = getattr(self._local, "conn", None)
+            if conn is not None and _closed(conn):
+                conn.close(); conn = None
+            reused = conn is not None
+            if not reused:
+                conn = self._local.conn = HTTPConnection(self.host, self.port, timeout=self.timeout)
+            sent = False
+            try:
+                conn.request(method, path, data, headers)
+                sent = True
+                response = conn.getresponse()
+                reply = json.loads(response.read() or b"{}")
+                break
+            except (OSError, HTTPException) as e:
+                # A kept connection may have died under us. Retry once on a new one, unless a write
+                # reached the service: it may have been applied, and sending it again would apply it twice.
+                conn.close(); self._local.conn = None
+                if not reused or (sent and method != "GET"):
+                    raise ServiceError(f"cannot reach the service at {self.host}:{self.port}: {e}") from e
+        if response.status == 404:
+            return None
+        if response.status == 409:
+            if reply.get("conflict"):
+                raise ConflictError(path.split("/")[2], reply.get("key"))
+            raise KeyError(reply.get("key"))
+        if response.status != 200:
+            raise ServiceError(reply.get("error", f"HTTP {response.status}"))
+        if "version" in reply and method != "GET":
+            self.version = reply["version"]
+        return reply
+
+    def make_views(self):
+        return {"Students": RemoteView(self, "students", STUDENT_COLUMNS),
+                "Programs": RemoteView(self, "programs", PROGRAM_COLUMNS),
+                "Colleges": RemoteView(self, "colleges", COLLEGE_COLUMNS)}
+
+    def refresh(self):
+        """Note edits made through the service since the last look; return the changed names."""
+        version = self.call("GET", "/api/version")["version"]
+        if version == self.version:
+            return []
+        self.version = version
+        return list(self.tables)
+
+    # ── Mutations ────────────────────────────────────────────────────────────
+
+    def _key(self, key):
+        return quote(key, safe="")
+
+    def insert(self, name, row):
+        self.call("POST", f"/api/{name}", body={"row": dict(row)})
+        return row
+
+    def stamp(self, name, key):
+        found = self.call("GET", f"/api/{name}/{self._key(key)}")
+        return None if found is None else found["stamp"]
+
+    def existing(self, name, keys):
+        return set(self.call("POST", f"/api/{name}/existing", body={"keys": list(keys)})["keys"])
+
+    def update(self, name, key, row, expected=None):
+        """Same as update_cascade(): the service always repoints the referencing rows."""
+        return self.update_cascade(name, key, row, expected)
+
+    def update_cascade(self, name, key, row, expected=None):
+        found = self.call("PUT", f"/api/{name}/{self._key(key)}", body={"row": dict(row), "expected": expected})
+        return None if found is None else row
+
+    def delete_cascade(self, name, keys):
+        self.call("POST", f"/api/{name}/delete", body={"keys": list(keys)})
+
+    def cascade_counts(self, name, keys):
+        counts = self.call("POST", f"/api/{name}/cascade", body={"keys": list(keys)})
+        return counts["programs"], counts["students"]
+
+    # ── Bulk edits ───────────────────────────────────────────────────────────
+
+    def assign_error(self, name, changes):
+        return self.call("POST", f"/api/{name}/assign/check", body={"keys": [], "changes": changes})["error"]
+
+    def assign_preview(self, name, keys, changes):
+        return self.call("POST", f"/api/{name}/assign/check", body={"keys": list(keys), "changes": changes})["count"]
+
+    def assign(self, name, keys, changes):
+        try:
+            return self.call("POST", f"/api/{name}/assign", body={"keys": list(keys), "changes": changes})["undo"]
+        except ServiceError as e:
+            raise ValueError(str(e)) from e
+
+    def undo_assign(self, name, undo):
+        done = self.call("POST", f"/api/{name}/undo", body={"undo": undo})
+        return done["restored"], done["skipped"]
+
+    # ── Bulk import ──────────────────────────────────────────────────────────
+
+    def import_chunk(self, chunk):
+        """importer.StudentImporter.add_chunk(), run by the service: (imported, rejects)."""
+        done = self.call("POST", "/api/students/import", body={"records": [list(c) for c in chunk]})
+        return done["imported"], [tuple(r) for r in done["rejects"]]
+
+    # ── Statistics ───────────────────────────────────────────────────────────
+
+    def enrollment(self):
+        return self.call("GET", "/api/enrollment")
+
+    # ── Validation ───────────────────────────────────────────────────────────
+
+    def resolve_program(self, value):
+        return self.call("GET", "/api/programs/resolve", {"value": value or ""})["prog_code"]
+
+    def student_error(self, row, old_id=None):
+        return self.call("POST", "/api/students/check", body={"row": dict(row), "old_id": old_id})["error"]
+
+
+class RemoteView:
+    """A section view whose queries run on the service; rows come back as tuples."""
+
+    def __init__(self, repo, name, columns):
+        self.repo = repo
+        self.name = name
+        self.columns = columns
+
+    def _params(self, query, filters, sort):
+        params = [("q", query)] if query else []
+        params += [(f, v) for f, values in (filters or {}).items() for v in values]
+        params += [("sort", f"{i}:desc" if reverse else str(i)) for i, reverse in sort or ()]
+        return params
+
+    def page(self, query="", filters=None, sort=None, size=PAGE_SIZE, cursor=None, direction="next", offset=None):
+        params = self._params(query, filters, sort) + [("size", size), ("direction", direction)]
+        if cursor is not None: params.append(("cursor", json.dumps(cursor)))
+        if offset is not None: params.append(("offset", offset))
+        p = self.repo.call("GET", f"/api/{self.name}/page", params)
+        return Page([tuple(r) for r in p["rows"]], p["total"], p["offset"], p["first"], p["last"])
+
+    def search(self, query, filters=None):
+        return self.iter_rows(query, filters)
+
+    def iter_rows(self, query="", filters=None, sort=None):
+        return [tuple(r) for r in self.repo.call("GET", f"/api/{self.name}/search", self._params(query, filters, sort))["rows"]]
+
+    def keys_matching(self, query, filters=None):
+        return set(self.repo.call("GET", f"/api/{self.name}/keys", self._params(query, filters, None))["keys"])
+
+    def facet_counts(self, query, filters):
+        return self.repo.call("GET", f"/api/{self.name}/facets", self._params(query, filters, None))["facets"]
+
+    def sort_rows(self, rows, spec):
+        """Stable in-place sort of `rows` by [(column index, reverse), ...], most significant first."""
+        for i, reverse in reversed(spec or ()):
+            rows.sort(key=lambda r: natural_key(r[i]), reverse=reverse)
+        return rows
@@ -0,0 +1,149 @@
+from array import array
+from collections import defaultdict
+
+_SEP = "\x1f"
+
+
+def _grams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2) if _SEP not in text[i:i + 3]}
+
+
+class SearchIndex:
+    """Trigram index for case-insensitive substring (and prefix) queries.
+
+    Each document is a list of fields stored under a key; a query matches a
+    document when it is a substring of any one field. Postings are compact
+    arrays of document ordinals; a query verifies only the candidates of its
+    rarest trigram, so cost follows the size of that posting rather than the
+    number of documents. Queries shorter than three characters fall back to a
+    scan of the pre-lowercased texts.
+    """
+
+    def __init__(self):
+        self.texts = []
+        self.keys = []
+        self.ordinal = {}
+        self.postings = defaultdict(lambda: array("i"))
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.ordinal)
+
+    def __contains__(self, key):
+        return key in self.ordinal
+
+    def add(self, key, fields):
+        if key in self.ordinal:
+            self.remove(key)
+        text = _SEP.join(str(f).lower() for f in fields)
+        o = len(self.texts)
+        self.texts.append(text)
+        self.keys.append(key)
+        self.ordinal[key] = o
+        for g in _grams(text):
+            self.postings[g].append(o)
+
+    def update(self, key, fields):
+        """Re-index a document only if its text actually changed."""
+        o = self.ordinal.get(key)
+        if o is not None and self.texts[o] == _SEP.join(str(f).lower() for f in fields):
+            return
+        self.add(key, fields)
+
+    def remove(self, key):
+        o = self.ordinal.pop(key, None)
+        if o is None:
+            return
+        self.texts[o] = None
+        self.keys[o] = None
+        self.dead += 1
+        if self.dead > 1024 and self.dead > len(self.ordinal):
+            self.compact()
+
+    def compact(self):
+        """Rebuild postings without the tombstones left by removals."""
+        live = [(k, self.texts[o]) for k, o in self.ordinal.items()]
+        self.texts, self.keys, self.ordinal, self.dead = [], [], {}, 0
+        self.postings = defaultdict(lambda: array("i"))
+        for k, text in live:
+            o = len(self.texts)
+            self.texts.append(text)
+            self.keys.append(k)
+            self.ordinal[k] = o
+            for g in _grams(text):
+                self.postings[g].append(o)
+
+    def search(self, query):
+        """Keys of the documents containing `query` in some field."""
+        q = query.lower().replace(_SEP, "")
+        texts = self.texts
+        if len(q) < 3:
+            return {self.keys[o] for o, t in enumerate(texts) if t is not None and q in t}
+        grams = _grams(q)
+        postings = [self.postings.get(g) for g in grams]
+        if not all(postings):
+            return set()
+        rarest = min(postings, key=len)
+        return {self.keys[o] for o in rarest if texts[o] is not None and q in texts[o]}
+
+
+class FacetIndex:
+    """Posting sets per facet value, for combining categorical filters.
+
+    Values picked within one facet are OR-ed together and facets are AND-ed,
+    so a filter costs the size of the postings involved rather than a pass
+    over every row.
+    """
+
+    def __init__(self, facets):
+        self.postings = {f: defaultdict(set) for f in facets}
+        self.values = {}
+
+    def update(self, key, values):
+        """Index `key` under {facet: value}; a no-op if nothing changed."""
+        old = self.values.get(key)
+        if old == values:
+            return
+        if old is not None:
+            self.remove(key)
+        self.values[key] = values
+        for f, v in values.items():
+            self.postings[f][v].add(key)
+
+    def remove(self, key):
+        old = self.values.pop(key, None)
+        if old is None:
+            return
+        for f, v in old.items():
+            posting = self.postings[f][v]
+            posting.discard(key)
+            if not posting:
+                del self.postings[f][v]
+
+    def select(self, selected):
+        """Keys matching every facet in {facet: [values]}; None if nothing is selected."""
+        matches = []
+        for f, vals in selected.items():
+            if vals:
+                postings = self.postings[f]
+                matches.append(set().union(*(postings.get(v, ()) for v in vals)))
+        if not matches:
+            return None
+        matches.sort(key=len)
+        result = matches[0]
+        for m in matches[1:]:
+            result &= m
+        return result
+
+    def counts(self, selected, base=None):
+        """{facet: {value: count}} under the other facets' selections (and `base` keys, if given)."""
+        out = {}
+        for f, postings in self.postings.items():
+            universe = self.select({g: v for g, v in selected.items() if g != f})
+            if base is not None:
+                universe = base if universe is None else (universe & base)
+            if universe is None:
+                out[f] = {v: len(p) for v, p in postings.items()}
+            else:
+                out[f] = {v: len(p & universe) for v, p in postings.items()}
+        return out
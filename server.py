@@ -0,0 +1,495 @@
+"""Local HTTP/JSON service: one warm Repository shared by every desk.
+
+    python server.py [--host 127.0.0.1] [--port 8765] [--threads 32]
+
+The roster is parsed and indexed once, here, and every client's searches,
+pages and edits are answered from memory by a fixed pool of worker
+threads. Changes other programs make to the data files are followed in the
+background. The app and CLI use the service instead of the files when
+SSIS_SERVER is set to its URL (see remote.py). Stdlib only.
+
+    GET  /api/version                    {"version"}: moves on every change
+    GET  /api/<table>/page?...           one page: {"rows", "total", "offset", "first", "last"}
+    GET  /api/<table>/search?...         {"rows"}: every match, sorted
+    GET  /api/<table>/keys?...           {"keys"}: every matching key
+    GET  /api/students/facets?...        {"facets": {facet: {value: count}}}
+    GET  /api/<table>                    {"rows"}: the stored rows
+    GET  /api/<table>/<key>              {"row", "stamp"}
+    POST /api/<table>                    add {"row"}
+    PUT  /api/<table>/<key>              edit {"row", "expected"}; referencing rows follow a new key
+    POST /api/<table>/delete             {"keys"}; dependents go too
+    POST /api/<table>/cascade            {"keys"} -> {"programs", "students"} a delete would touch
+    POST /api/<table>/existing           {"keys"} -> {"keys"} of those the table holds
+    POST /api/<table>/assign/check       {"keys", "changes"} -> {"count"} rows a bulk edit changes, {"error"}
+    POST /api/<table>/assign             bulk edit {"keys", "changes"} -> {"undo"}
+    POST /api/<table>/undo               {"undo"} from assign -> {"restored", "skipped"}
+    GET  /api/programs/resolve?value=... {"prog_code"} for a program name or code
+    POST /api/students/check             {"row", "old_id"} -> {"error"}
+    POST /api/students/import            {"records": [[line, record], ...]}, one importer chunk
+                                         -> {"imported", "rejects": [[line, reason, row], ...]}
+    GET  /api/enrollment                 student counts by year, gender, program and college
+    GET  /api/stats                      row counts, version and requests served
+    GET  /api/profile                    timing histograms (with SSIS_PROFILE set; see profiling.py)
+
+<table> is students, programs or colleges. The view queries take q (search
+text), gender/year/program/college (repeatable filters), sort=<column
+index>[:desc] (repeatable, most significant first), and for a page size,
+offset, or cursor (a page's first/last, as JSON) with direction next, prev
+or at. Writes answer with the new {"version"}. Errors are {"error": ...}
+with 400 for bad input, 404 for a missing row and 409 for a duplicate key
+or, with "conflict": true, a stale "expected" stamp.
+"""
+import argparse
+import json
+import queue
+import select
+import selectors
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from itertools import count
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import profiling
+from importer import StudentImporter
+from store import open_repository, ConflictError
+from views import make_views, dump_cursor, load_cursor, PAGE_SIZE
+from watcher import create_watcher
+
+THREADS = 32
+IDLE_SECONDS = 60
+READ_SECONDS = 5
+REFRESH_SECONDS = 1.0
+SECTIONS = {"students": "Students", "programs": "Programs", "colleges": "Colleges"}
+FILTERS = ("gender", "year", "program", "college")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **extra}
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer handing each request to a fixed pool of worker threads.
+
+    Connections are kept alive, but only a request holds a worker: between
+    requests a connection is parked in a selector on its own thread and
+    goes back to the pool once its next request starts arriving, so any
+    number of desks can stay connected. A connection idle for IDLE_SECONDS
+    is closed.
+    """
+
+    def __init__(self, address, handler, service, threads=THREADS):
+        super().__init__(address, handler)
+        self.service = service
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix="ssis-http")
+        self._parked = queue.SimpleQueue()
+        self._wake, self._waker = socket.socketpair()
+        self._closing = False
+        self._park_lock = threading.Lock()  # nothing is parked once _closing is set
+        threading.Thread(target=self._wait_idle, daemon=True, name="ssis-idle").start()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._serve, self.RequestHandlerClass(request, client_address, self))
+
+    def _serve(self, conn):
+        """Answer the request arriving on `conn`, then park the connection for the next one."""
+        try:
+            keep = conn.serve_one()
+        except Exception:
+            self.handle_error(conn.request, conn.client_address)
+            keep = False
+        if keep and not self._closing and conn.waiting():
+            return self.pool.submit(self._serve, conn)
+        with self._park_lock:
+            keep = keep and not self._closing
+            if keep:
+                self._parked.put(conn)
+        if keep:
+            self._waker.send(b"\0")
+        else:
+            conn.close()
+
+    def _wait_idle(self):
+        """Watch the parked connections; hand those with a request coming in back to the pool."""
+        idle = selectors.DefaultSelector()
+        idle.register(self._wake, selectors.EVENT_READ)
+        while not self._closing:
+            for key, _ in idle.select(1.0):
+                if key.fileobj is self._wake:
+                    self._wake.recv(4096)
+                    while True:
+                        try:
+                            conn = self._parked.get_nowait()
+                        except queue.Empty:
+                            break
+                        idle.register(conn.connection, selectors.EVENT_READ, (conn, time.monotonic()))
+                elif not self._closing:
+                    idle.unregister(key.fileobj)
+                    self.pool.submit(self._serve, key.data[0])
+            now = time.monotonic()
+            for key in list(idle.get_map().values()):
+                if key.data and now - key.data[1] > IDLE_SECONDS:
+                    idle.unregister(key.fileobj)
+                    key.data[0].close()
+        # Shutting down: close every parked keep-alive connection, including any parked just now.
+        parked = [key.data[0] for key in idle.get_map().values() if key.data]
+        idle.close()
+        with self._park_lock:
+            while True:
+                try:
+                    parked.append(self._parked.get_nowait())
+                except queue.Empty:
+                    break
+        for conn in parked:
+            conn.close()
+
+    def server_close(self):
+        super().server_close()
+        with self._park_lock:
+            self._closing = True
+        self._waker.send(b"\0")
+        self.pool.shutdown(wait=False)
+
+
+class Service:
+    """The shared repository and views, with the JSON operations on them."""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.views = make_views(repo)
+        self.served = count()
+        self.started = time.time()
+        self.refresh_error = None
+
+    def warm(self):
+        """Build every view's rows and search index up front instead of on the first query."""
+        with self.repo.lock:
+            for view in self.views.values():
+                view.sync()
+                view._ensure_index()
+
+    def follow(self, interval=REFRESH_SECONDS):
+        """Keep catching up with changes to the data files (run on a daemon thread).
+
+        A failed refresh (a file mid-write, a locked database) is logged, shown
+        as "refresh_error" in /api/stats until one succeeds, and tried again.
+        """
+        watcher = create_watcher(self.repo.backend.watch_paths())
+        while True:
+            if watcher is None:
+                time.sleep(interval)
+            elif select.select([watcher], [], [], interval)[0]:
+                watcher.read()
+            try:
+                self.repo.refresh()
+            except Exception as e:
+                if self.refresh_error is None:
+                    traceback.print_exc()
+                self.refresh_error = repr(e)
+                if watcher is not None:
+                    time.sleep(interval)  # the event that failed won't come again; poll meanwhile
+            else:
+                self.refresh_error = None
+
+    def _table(self, name):
+        if name not in SECTIONS:
+            raise HttpError(404, f"no table {name!r}")
+        return self.repo.tables[name]
+
+    def _written(self):
+        return {"version": self.repo.version}
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def query(self, name, action, params):
+        view = self.views[SECTIONS[name]] if name in SECTIONS else None
+        if view is None:
+            raise HttpError(404, f"no table {name!r}")
+        query = params.get("q", [""])[-1]
+        filters = {f: set(params[f]) for f in FILTERS if f in params} or None
+        try:
+            sort = [(int(s.split(":")[0]), s.endswith(":desc")) for s in params.get("sort", [])]
+            if any(not 0 <= i < len(view.columns) for i, _ in sort):
+                raise ValueError("sort column out of range")
+            if action == "page":
+                page = view.page(query, filters, sort, int(params.get("size", [PAGE_SIZE])[-1]),
+                                 load_cursor(json.loads(params["cursor"][-1])) if "cursor" in params else None,
+                                 params.get("direction", ["next"])[-1],
+                                 int(params["offset"][-1]) if "offset" in params else None)
+                return {"rows": page.rows, "total": page.total, "offset": page.offset,
+                        "first": dump_cursor(page.first), "last": dump_cursor(page.last)}
+        except (ValueError, TypeError, IndexError) as e:
+            raise HttpError(400, f"bad query: {e}")
+        if action == "search":
+            return {"rows": list(view.iter_rows(query, filters, sort))}
+        if action == "keys":
+            return {"keys": list(view.keys_matching(query, filters))}
+        if action == "facets" and name == "students":
+            return {"facets": view.facet_counts(query, filters or {})}
+        raise HttpError(404, f"no action {action!r}")
+
+    def rows(self, name):
+        with self.repo.lock:
+            return {"rows": [dict(r) for r in self._table(name)]}
+
+    def row(self, name, key):
+        with self.repo.lock:
+            row = self._table(name).get(key)
+            if row is None:
+                raise HttpError(404, f"no row {key!r} in {name}")
+            return {"row": dict(row), "stamp": self.repo.stamp(name, key)}
+
+    def cascade(self, name, body):
+        with self.repo.lock:
+            programs, students = self.repo.cascade_counts(name, set(self._keys(name, body)))
+        return {"programs": programs, "students": students}
+
+    def stats(self):
+        with self.repo.lock:
+            counts = {name: len(t) for name, t in self.repo.tables.items()}
+        return dict(counts, version=self.repo.version, requests=next(self.served),
+                    uptime=round(time.time() - self.started, 1), refresh_error=self.refresh_error)
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def _check(self, name, row, old_key=None):
+        """Reject a row the GUI's popups would not save: HttpError 400 (409 for a key in use)."""
+        t = self._table(name)
+        if name == "students":
+            error = self.repo.student_error(row, old_key)
+        elif not row.get(t.pk) or not row.get("name"):
+            error = "Please fill all fields."
+        elif row.get("college_code") and row["college_code"] not in self.repo.colleges:
+            error = f"Unknown college '{row['college_code']}'."
+        else:
+            error = None
+        if error:
+            key = row.get(t.pk)
+            raise HttpError(409 if key != old_key and key in t else 400, error, key=key)
+
+    def add(self, name, body):
+        self._table(name)
+        row = self._row(body)
+        with self.repo.batch():
+            self._check(name, row)
+            try:
+                self.repo.insert(name, row)
+            except KeyError as e:
+                raise HttpError(409, f"{e.args[0]} already exists", key=e.args[0])
+        return self._written()
+
+    def edit(self, name, key, body):
+        self._table(name)
+        row = self._row(body)
+        try:
+            with self.repo.batch():
+                if key in self.repo.tables[name]:
+                    self._check(name, row, key)
+                saved = self.repo.update_cascade(name, key, row, body.get("expected"))
+        except ConflictError:
+            raise HttpError(409, f"{key} was changed or deleted by someone else", conflict=True, key=key)
+        except KeyError as e:
+            raise HttpError(409, f"{e.args[0]} already exists", key=e.args[0])
+        if saved is None:
+            raise HttpError(404, f"no row {key!r} in {name}")
+        return self._written()
+
+    def delete(self, name, body):
+        self.repo.delete_cascade(name, self._keys(name, body))
+        return self._written()
+
+    def import_chunk(self, body):
+        """Validate and add one chunk of importer records (see importer.py), committed on its own."""
+        records = body.get("records")
+        if not isinstance(records, list) or not all(
+                isinstance(r, list) and len(r) == 2 and (r[1] is None or isinstance(r[1], dict)) for r in records):
+            raise HttpError(400, "expected {\"records\": [[line, {...}], ...]}")
+        with self.repo.lock:
+            importer = StudentImporter(self.repo)
+        imported, rejects = importer.add_chunk([tuple(r) for r in records])
+        return dict(self._written(), imported=imported, rejects=rejects)
+
+    def assign_check(self, name, body):
+        keys, changes = self._keys(name, body), self._changes(body)
+        return {"count": self.repo.assign_preview(name, keys, changes), "error": self.repo.assign_error(name, changes)}
+
+    def assign(self, name, body):
+        keys, changes = self._keys(name, body), self._changes(body)
+        try:
+            undo = self.repo.assign(name, keys, changes)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return dict(self._written(), undo=undo)
+
+    def undo(self, name, body):
+        t = self._table(name)
+        undo, columns = body.get("undo"), set(t.headers) - {t.pk}
+        if not isinstance(undo, dict) or not all(
+                isinstance(e, list) and len(e) == 2 and isinstance(e[1], dict) and set(e[1]) <= columns
+                and all(isinstance(v, str) for v in e[1].values()) for e in undo.values()):
+            raise HttpError(400, "expected {\"undo\": {key: [stamp, {column: value}]}} from assign")
+        restored, skipped = self.repo.undo_assign(name, undo)
+        return dict(self._written(), restored=restored, skipped=skipped)
+
+    def _changes(self, body):
+        changes = body.get("changes")
+        if not isinstance(changes, dict):
+            raise HttpError(400, "expected {\"changes\": {...}}")
+        return {k: str(v) for k, v in changes.items()}
+
+    def _keys(self, name, body):
+        self._table(name)
+        keys = body.get("keys")
+        if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+            raise HttpError(400, "expected {\"keys\": [...]}")
+        return keys
+
+    def _row(self, body):
+        row = body.get("row")
+        if not isinstance(row, dict):
+            raise HttpError(400, "expected {\"row\": {...}}")
+        return {k: str(v) for k, v in row.items()}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """One client connection, set up once; PooledHTTPServer calls serve_one() per request."""
+    protocol_version = "HTTP/1.1"
+    timeout = READ_SECONDS  # a client stalling mid-request frees its worker after this
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def __init__(self, request, client_address, server):
+        self.request, self.client_address, self.server = request, client_address, server
+        self.setup()
+
+    def serve_one(self):
+        """Answer one request; True if the connection stays open for another."""
+        self.close_connection = True
+        self.handle_one_request()
+        return not self.close_connection
+
+    def waiting(self):
+        """True if (part of) the next request has already arrived or is buffered."""
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def close(self):
+        try:
+            self.finish()
+        finally:
+            self.server.shutdown_request(self.request)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _dispatch(self, method):
+        service = self.server.service
+        next(service.served)
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=True)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        try:
+            if parts[0] != "api" or len(parts) < 2:
+                raise HttpError(404, "not found")
+            body = self._body() if method in ("POST", "PUT") else None
+            with profiling.span(f"http.{method}"):
+                out = self._route(service, method, parts[1:], params, body)
+        except HttpError as e:
+            return self._send(e.status, e.body)
+        except (TypeError, ValueError, KeyError) as e:
+            return self._send(400, {"error": f"bad request: {e!r}"})
+        except Exception as e:
+            self.server.handle_error(self.request, self.client_address)
+            return self._send(500, {"error": f"internal error: {e!r}"})
+        self._send(200, out)
+
+    def _route(self, service, method, parts, params, body):
+        if method == "GET":
+            if parts == ["version"]: return {"version": service.repo.version}
+            if parts == ["stats"]: return service.stats()
+            if parts == ["enrollment"]: return service.repo.enrollment()
+            if parts == ["profile"]: return profiling.snapshot()
+            if len(parts) == 1: return service.rows(parts[0])
+            if parts == ["programs", "resolve"]:
+                return {"prog_code": service.repo.resolve_program(params.get("value", [""])[-1])}
+            if parts[1] in ("page", "search", "keys", "facets"): return service.query(parts[0], parts[1], params)
+            if len(parts) == 2: return service.row(parts[0], parts[1])
+        elif method == "POST":
+            if len(parts) == 1: return service.add(parts[0], body)
+            if parts[1:] == ["delete"]: return service.delete(parts[0], body)
+            if parts[1:] == ["cascade"]: return service.cascade(parts[0], body)
+            if parts[1:] == ["existing"]: return {"keys": sorted(service.repo.existing(parts[0], service._keys(parts[0], body)))}
+            if parts[1:] == ["assign", "check"]: return service.assign_check(parts[0], body)
+            if parts[1:] == ["assign"]: return service.assign(parts[0], body)
+            if parts[1:] == ["undo"]: return service.undo(parts[0], body)
+            if parts == ["students", "import"]: return service.import_chunk(body)
+            if parts == ["students", "check"]:
+                return {"error": service.repo.student_error(service._row(body), body.get("old_id"))}
+        elif len(parts) == 2:
+            return service.edit(parts[0], parts[1], body)
+        raise HttpError(404, "not found")
+
+    def _body(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            raise HttpError(400, "body is not JSON")
+        if not isinstance(body, dict):
+            raise HttpError(400, "body must be a JSON object")
+        return body
+
+    def _send(self, status, body):
+        data = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_server(repo, host="127.0.0.1", port=8765, threads=THREADS):
+    """A PooledHTTPServer for `repo`, following the data files in the background; call serve_forever()."""
+    service = Service(repo)
+    service.warm()
+    threading.Thread(target=service.follow, daemon=True, name="ssis-follow").start()
+    return PooledHTTPServer((host, port), Handler, service, threads)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve the roster over HTTP/JSON.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    ap.add_argument("--threads", type=int, default=THREADS, help="worker threads: requests answered at once")
+    args = ap.parse_args(argv)
+    server = make_server(open_repository(), args.host, args.port, args.threads)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Optional SQLite storage backend (stdlib sqlite3, no server).
+
+The schema mirrors the CSV headers with primary keys, foreign keys and
+secondary indexes, so edits, cascades and lookups become indexed statements
+instead of full-file rewrites. Use it by pointing SSIS_DB at a database
+file; move data between the CSVs and a database with
+
+    python sqlite_store.py import roster.db
+    python sqlite_store.py export roster.db
+"""
+import argparse
+import sqlite3
+from contextlib import contextmanager
+
+from store import (Table, CsvBackend, write_csv_temp, STUDENT_CSV, PROGRAM_CSV, COLLEGE_CSV,
+                   STUDENT_HEADERS, PROGRAM_HEADERS, COLLEGE_HEADERS)
+
+TABLES = {
+    "students": (STUDENT_HEADERS, "id"),
+    "programs": (PROGRAM_HEADERS, "prog_code"),
+    "colleges": (COLLEGE_HEADERS, "college_code"),
+}
+
+# Foreign-key columns hold NULL where the CSVs hold "" (Not Enrolled / N/A).
+NULLABLE = {"students": {"prog_code"}, "programs": {"college_code"}, "colleges": set()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS colleges (
+    college_code TEXT PRIMARY KEY,
+    name         TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS programs (
+    prog_code    TEXT PRIMARY KEY,
+    name         TEXT NOT NULL DEFAULT '',
+    college_code TEXT REFERENCES colleges(college_code) ON UPDATE CASCADE ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS students (
+    id        TEXT PRIMARY KEY,
+    firstname TEXT NOT NULL DEFAULT '',
+    lastname  TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    prog_code TEXT REFERENCES programs(prog_code) ON UPDATE CASCADE ON DELETE SET NULL,
+    year      TEXT NOT NULL DEFAULT '',
+    gender    TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS programs_college_code ON programs(college_code);
+CREATE INDEX IF NOT EXISTS students_prog_code ON students(prog_code);
+CREATE INDEX IF NOT EXISTS students_lastname ON students(lastname);
+CREATE INDEX IF NOT EXISTS students_year ON students(year);
+
+CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0);
+INSERT OR IGNORE INTO table_versions (name) VALUES ('students'), ('programs'), ('colleges');
+"""
+
+_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {t}_{op}_version AFTER {op} ON {t}
+BEGIN UPDATE table_versions SET version = version + 1 WHERE name = '{t}'; END;
+"""
+
+
+def _params(table, row):
+    nullable = NULLABLE[table.name]
+    return [(row[h] or None) if h in nullable else row[h] for h in table.headers]
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA + "".join(_TRIGGER.format(t=t, op=op) for t in TABLES for op in ("INSERT", "UPDATE", "DELETE")))
+    return conn
+
+
+class SqliteBackend:
+    """Repository storage in a single SQLite database.
+
+    Every write, and every Repository.batch(), runs in one transaction. Renames and deletes cascade through
+    the foreign keys, and a table's signature is a version counter that
+    triggers bump on each change, so refresh() notices other writers.
+
+    Transactions start with BEGIN IMMEDIATE, taking the database's write
+    lock up front, so the checks a batch makes after catching up (duplicate
+    keys, version stamps) still hold when it writes. A key that is taken
+    anyway raises KeyError, as for the CSV backend.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = connect(path)
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """Nestable transaction: only the outermost level commits (or rolls back)."""
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+        self._depth = 1
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                yield
+        finally:
+            self._depth = 0
+
+    def _taken(self, table, error, keys):
+        """KeyError for the first of `keys` already stored if `error` is a duplicate primary key; else `error`."""
+        if f"UNIQUE constraint failed: {table.name}.{table.pk}" not in str(error):
+            return error
+        stored = f"SELECT 1 FROM {table.name} WHERE {table.pk} = ?"
+        return KeyError(next((k for k in keys if self.conn.execute(stored, (k,)).fetchone()), keys[0]))
+
+    def watch_paths(self):
+        return [self.path, self.path + "-wal"]
+
+    def signature(self, table):
+        return self.conn.execute("SELECT version FROM table_versions WHERE name = ?", (table.name,)).fetchone()[0]
+
+    def catch_up(self):
+        """Nothing to apply incrementally: changed tables show up in signature() and are reloaded."""
+        return []
+
+    def load(self, table):
+        cur = self.conn.execute(f"SELECT {', '.join(table.headers)} FROM {table.name} ORDER BY rowid")
+        return [dict(zip(table.headers, r)) for r in cur]
+
+    def insert(self, table, rows):
+        cols = ", ".join(table.headers)
+        marks = ", ".join("?" * len(table.headers))
+        with self.transaction():
+            self.conn.execute("SAVEPOINT insert_rows")
+            try:
+                self.conn.executemany(f"INSERT INTO {table.name} ({cols}) VALUES ({marks})",
+                                      (_params(table, r) for r in rows))
+            except sqlite3.IntegrityError as e:
+                self.conn.execute("ROLLBACK TO insert_rows")  # so only keys stored before this insert are found
+                raise self._taken(table, e, [r[table.pk] for r in rows]) from e
+            self.conn.execute("RELEASE insert_rows")
+
+    def update(self, table, key, row):
+        sets = ", ".join(f"{h} = ?" for h in table.headers)
+        with self.transaction():
+            try:
+                self.conn.execute(f"UPDATE {table.name} SET {sets} WHERE {table.pk} = ?", _params(table, row) + [key])
+            except sqlite3.IntegrityError as e:
+                raise self._taken(table, e, [row[table.pk]]) from e
+
+    def delete(self, table, keys):
+        with self.transaction():
+            self.conn.executemany(f"DELETE FROM {table.name} WHERE {table.pk} = ?", ((k,) for k in keys))
+
+    def reassign(self, table, column, old_values, new_value):
+        value = (new_value or None) if column in NULLABLE[table.name] else new_value
+        with self.transaction():
+            self.conn.executemany(f"UPDATE {table.name} SET {column} = ? WHERE {column} = ?",
+                                  ((value, v) for v in old_values))
+
+    def assign(self, table, keys, changes):
+        nullable = NULLABLE[table.name]
+        sets = ", ".join(f"{c} = ?" for c in changes)
+        values = [(v or None) if c in nullable else v for c, v in changes.items()]
+        with self.transaction():
+            self.conn.executemany(f"UPDATE {table.name} SET {sets} WHERE {table.pk} = ?", (values + [k] for k in keys))
+
+
+# ── Import / export ───────────────────────────────────────────────────────────
+
+def import_csv(db_path, student_csv=STUDENT_CSV, program_csv=PROGRAM_CSV, college_csv=COLLEGE_CSV):
+    """Replace the database contents with the three CSVs; return {table: row count}."""
+    source = CsvBackend(student_csv, program_csv, college_csv)
+    conn = connect(db_path)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    counts = {}
+    with conn:
+        for name, path in (("colleges", college_csv), ("programs", program_csv), ("students", student_csv)):
+            headers, pk = TABLES[name]
+            table = Table(name, headers, pk)
+            table.load(source.load(table))
+            conn.execute(f"DELETE FROM {name}")
+            conn.executemany(f"INSERT INTO {name} ({', '.join(headers)}) VALUES ({', '.join('?' * len(headers))})",
+                             (_params(table, r) for r in table.rows.values()))
+            counts[name] = len(table)
+    dangling = conn.execute("PRAGMA foreign_key_check").fetchall()
+    conn.close()
+    if dangling:
+        counts["dangling_references"] = len(dangling)
+    return counts
+
+
+def export_csv(db_path, student_csv=STUDENT_CSV, program_csv=PROGRAM_CSV, college_csv=COLLEGE_CSV):
+    """Write every table of the database back to its CSV; return {table: row count}.
+
+    The three files replace the old ones together, as a checkpoint of the
+    CSV backend's journal, so pending journaled changes don't replay on top.
+    """
+    backend = SqliteBackend(db_path)
+    target = CsvBackend(student_csv, program_csv, college_csv)
+    counts, temps = {}, []
+    with target.journal.locked():  # a compaction elsewhere writes the same temp files
+        for name, path in (("students", student_csv), ("programs", program_csv), ("colleges", college_csv)):
+            headers, pk = TABLES[name]
+            table = Table(name, headers, pk)
+            rows = [table.conform(r) for r in backend.load(table)]
+            temps.append((write_csv_temp(path, map(table.values, rows), headers), path))
+            counts[name] = len(rows)
+        target.journal.compact(temps)
+    backend.conn.close()
+    return counts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Copy the roster between the CSV files and a SQLite database.")
+    ap.add_argument("action", choices=["import", "export"], help="import: CSV -> database, export: database -> CSV")
+    ap.add_argument("db", help="path to the SQLite database file")
+    args = ap.parse_args()
+    counts = (import_csv if args.action == "import" else export_csv)(args.db)
+    print(", ".join(f"{n} {k}" for k, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,755 @@
+import csv
+import os
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
+import pathlib
+import re
+import threading
+import time
+
+from journal import Journal, apply as apply_op, COMPACT_BYTES, OP_ROWS
+from profiling import span, timed
+from records import RECORD_TYPES, StudentRecord, ProgramRecord, CollegeRecord
+
+_BASE = pathlib.Path(__file__).parent
+STUDENT_CSV = str(_BASE / "student.csv")
+PROGRAM_CSV = str(_BASE / "program.csv")
+COLLEGE_CSV = str(_BASE / "college.csv")
+JOURNAL_NAME = "ssis.journal"
+
+STUDENT_HEADERS = list(StudentRecord.fields)
+PROGRAM_HEADERS = list(ProgramRecord.fields)
+COLLEGE_HEADERS = list(CollegeRecord.fields)
+
+ID_PATTERN = re.compile(r"^\d{4}-\d{4}$")
+YEAR_LEVELS = ["1", "2", "3", "4", "5"]
+GENDERS = ["Male", "Female", "Other"]
+NOT_ENROLLED = "Not Enrolled"
+
+
+def ensure_csv(file, headers):
+    if not os.path.exists(file):
+        with open(file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+
+
+def iter_csv(file):
+    """Yield the rows of a CSV as dicts, one at a time (none if the file is missing)."""
+    return csv_rows(open_csv(file))
+
+
+def open_csv(file):
+    """`file` opened for csv_rows(), or None if it doesn't exist."""
+    try:
+        return open(file, newline="")
+    except FileNotFoundError: return None
+
+
+def csv_rows(f):
+    """Yield the rows of an open CSV file as dicts, then close it."""
+    if f is None:
+        return
+    with f:
+        yield from csv.DictReader(f)
+
+
+def write_csv_temp(file, rows, headers):
+    """Write a full CSV of `rows` (sequences in `headers` order) next to `file` and fsync it; return the temp path."""
+    tmp = f"{file}.tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def file_signature(file):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(file)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+# ── Tables ────────────────────────────────────────────────────────────────────
+
+class ConflictError(Exception):
+    """A row changed or was deleted since the caller read it (see Repository.update)."""
+
+    def __init__(self, table, key):
+        super().__init__(f"{table} row {key!r} was changed by someone else")
+        self.table = table
+        self.key = key
+
+
+class Table:
+    """One table held in memory as rows keyed by primary key, in storage order.
+
+    If the table has a foreign-key column (`ref`), a reverse index maps each
+    referenced key to the set of rows pointing at it, so cascades find their
+    rows in O(affected) instead of scanning the table. For each `counted`
+    column, `counts[column]` keeps {value: rows} up to date on every change,
+    for statistics that never scan the rows.
+
+    Rows are the compact records from records.py for the known tables (plain
+    dicts otherwise) and are replaced, never edited in place; `values(row)`
+    gives a row's columns as a tuple in header order.
+
+    Every change appends the touched keys to `journal`, so derived caches can
+    catch up with `changes_since()` instead of rebuilding. The journal is
+    dropped (and `epoch` bumped) on a reload or once it outgrows the table.
+    """
+    JOURNAL_MIN = 1024
+
+    def __init__(self, name, headers, pk, ref=None, counted=()):
+        self.name = name
+        self.headers = headers
+        self.pk = pk
+        self.ref = ref
+        self.counts = {c: {} for c in counted}
+        self.record = RECORD_TYPES.get(name)
+        self.values = attrgetter(*headers) if self.record else itemgetter(*headers)
+        self.rows = {}
+        self.refs = {}
+        self.epoch = 0
+        self.journal = []
+
+    def load(self, data):
+        with span(f"load.{self.name}") as timing:
+            rows = {}
+            for r in data:
+                row = self.conform(r)
+                rows[row[self.pk]] = row
+            timing.rows = len(rows)
+        self.rows = rows
+        self.refs = {}
+        self.counts = {c: {} for c in self.counts}
+        self.epoch += 1
+        self.journal = []
+        if self.ref or self.counts:
+            for k, r in rows.items():
+                self._link(k, r)
+
+    def conform(self, row):
+        """Coerce a row to exactly this table's columns, all strings."""
+        if self.record:
+            return self.record.from_mapping(row)
+        return {h: (row.get(h) or "") for h in self.headers}
+
+    def _link(self, key, row):
+        if self.ref:
+            self.refs.setdefault(row[self.ref], set()).add(key)
+        for c, counts in self.counts.items():
+            counts[row[c]] = counts.get(row[c], 0) + 1
+
+    def _unlink(self, key, row):
+        if self.ref:
+            members = self.refs.get(row[self.ref])
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self.refs[row[self.ref]]
+        for c, counts in self.counts.items():
+            n = counts.get(row[c], 0) - 1
+            if n > 0: counts[row[c]] = n
+            else: counts.pop(row[c], None)
+
+    def _touch(self, keys):
+        self.journal.extend(keys)
+        if len(self.journal) > max(self.JOURNAL_MIN, len(self.rows)):
+            self.epoch += 1
+            self.journal = []
+
+    def changes_since(self, mark):
+        """(keys touched since `mark`, new mark); keys is None if everything must be rebuilt.
+
+        A None among the keys means rows were removed or renamed, so a key
+        seen again may have moved to the end of the table.
+        """
+        if mark is None or mark[0] != self.epoch:
+            return None, (self.epoch, len(self.journal))
+        return self.journal[mark[1]:], (self.epoch, len(self.journal))
+
+    def referencing(self, values):
+        """Keys of the rows whose foreign key is one of `values`."""
+        out = set()
+        for v in values:
+            out |= self.refs.get(v, set())
+        return out
+
+    def add(self, row):
+        self.rows[row[self.pk]] = row
+        self._link(row[self.pk], row)
+        self._touch((row[self.pk],))
+
+    def replace(self, key, row):
+        """Store `row` in place of `key`, keeping its position if the key changes."""
+        self._unlink(key, self.rows[key])
+        new_key = row[self.pk]
+        if new_key == key:
+            self.rows[key] = row
+        else:
+            self.rows = {(new_key if k == key else k): (row if k == key else v) for k, v in self.rows.items()}
+        self._link(new_key, row)
+        self._touch((key,) if new_key == key else (key, new_key, None))
+
+    def discard(self, keys):
+        gone = []
+        for k in keys:
+            row = self.rows.pop(k, None)
+            if row is not None:
+                self._unlink(k, row)
+                gone.append(k)
+        if gone:
+            self._touch(gone + [None])
+
+    def set_value(self, keys, column, value):
+        self.assign(keys, {column: value})
+
+    def assign(self, keys, changes):
+        """Set the columns in `changes` (never the primary key) on the rows `keys`."""
+        keys = list(keys)
+        indexed = self.ref in changes or any(c in self.counts for c in changes)
+        for k in keys:
+            row = self.rows[k]
+            if indexed:
+                self._unlink(k, row)
+            row = self.rows[k] = self.conform({**row, **changes})
+            if indexed:
+                self._link(k, row)
+        self._touch(keys)
+
+    def get(self, key, default=None):
+        return self.rows.get(key, default)
+
+    def stamp(self, key):
+        """Version stamp of a row: changes whenever the row does; None if the row is gone."""
+        row = self.rows.get(key)
+        return None if row is None else hash(self.values(row))
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def __iter__(self):
+        return iter(self.rows.values())
+
+    def __len__(self):
+        return len(self.rows)
+
+
+# ── Storage backends ──────────────────────────────────────────────────────────
+
+class CsvBackend:
+    """Default storage: one CSV file per table, plus a write-ahead journal.
+
+    Changes are not written to the CSVs as they happen. Each transaction is
+    appended to the journal (journal.py) and fsynced as one record; the CSVs
+    are rewritten (temp file, fsync, atomic rename, all tables together)
+    only when the journal outgrows COMPACT_BYTES, or on `compact()`. Loading
+    a table replays its journaled operations over the CSV, and opening the
+    backend rolls back a half-written transaction or finishes an interrupted
+    compaction. A table's signature is its file's (mtime_ns, size) plus the
+    journal generation and the last transaction that touched it.
+
+    Several processes can share the files. A transaction holds the
+    journal's write lock from start to commit, and `catch_up()` applies
+    other processes' commits to the tables this process has loaded, so a
+    writer sees the latest rows without reloading them.
+
+    A transaction of more than CHECKPOINT_ROWS rows (a bulk import) skips
+    the journal and is written as a checkpoint straight away, and tables
+    this process holds up to date are checkpointed from memory instead of
+    being replayed from disk.
+    """
+    CHECKPOINT_ROWS = 50_000
+
+    def __init__(self, student_csv=STUDENT_CSV, program_csv=PROGRAM_CSV, college_csv=COLLEGE_CSV, journal_path=None):
+        self.paths = {"students": student_csv, "programs": program_csv, "colleges": college_csv}
+        self.journal = Journal(journal_path or os.path.join(os.path.dirname(os.path.abspath(student_csv)), JOURNAL_NAME))
+        self.tables = {}
+        self._seen = {}
+        self._depth = 0
+        self._ops = []
+
+    def signature(self, table):
+        return file_signature(self.paths[table.name]), self.journal.generation, self.journal.touched.get(table.name)
+
+    def watch_paths(self):
+        """Files whose changes may alter the tables (for the change watcher)."""
+        return list(self.paths.values()) + [self.journal.path]
+
+    def _mark(self, name):
+        self._seen[name] = (self.journal.generation, self.journal.touched.get(name))
+
+    def _current(self, name):
+        """True if the in-memory table already holds every committed change to it."""
+        return name in self.tables and self._seen.get(name) == (self.journal.generation, self.journal.touched.get(name))
+
+    def catch_up(self):
+        """Apply transactions committed elsewhere to the loaded tables; return the names changed.
+
+        Tables that were not up to date, or a journal that was compacted in
+        the meantime, are left to a full reload (their signatures differ).
+        """
+        current = {n for n in self.tables if self._current(n)}
+        commits = self.journal.tail()
+        if self.journal.interrupted and self._depth:
+            self.journal.recover()
+            return []
+        changed = set()
+        if commits:
+            with span("journal.catch_up") as timing:
+                for _, ops in commits:
+                    for name, kind, *args in ops:
+                        if name in current:
+                            apply_op(self.tables[name], kind, *args)
+                            changed.add(name)
+                timing.rows = sum(len(ops) for _, ops in commits)
+        for name in current:
+            self._mark(name)
+        return sorted(changed) if commits is not None else []
+
+    def load(self, table):
+        self.tables[table.name] = table
+        path = self.paths[table.name]
+        while True:
+            generation = self.journal.generation
+            f = open_csv(path)
+            ops = self.journal.operations(table.name, generation)
+            if ops is not None:
+                break
+            if f: f.close()
+            time.sleep(0.005)
+            self.journal.tail()
+        self._mark(table.name)
+        rows = csv_rows(f)
+        return self._replayed(table, ops, rows).rows.values() if ops else rows
+
+    def _replayed(self, table, ops, rows=None):
+        scratch = Table(table.name, table.headers, table.pk, table.ref)
+        scratch.load(iter_csv(self.paths[table.name]) if rows is None else rows)
+        with span("journal.replay") as timing:
+            for op in ops:
+                apply_op(scratch, *op)
+            timing.rows = len(ops)
+        return scratch
+
+    @contextmanager
+    def transaction(self):
+        with self.journal.locked():
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                if self._depth == 1:
+                    self._ops = []
+                raise
+            finally:
+                self._depth -= 1
+            if self._depth == 0:
+                self._commit()
+
+    def _commit(self):
+        ops, self._ops = self._ops, []
+        if not ops:
+            return
+        names = {op[0].name for op in ops}
+        rows = sum(len(op[2]) for op in ops if op[1] == "insert")
+        current = {n for n in self.tables if self._current(n)}
+        if rows > self.CHECKPOINT_ROWS and len(current) == len(self.tables):
+            self.compact(names)
+            return
+        with span("journal.commit") as timing:
+            self.journal.append(self._records(ops))
+            timing.rows = len(ops)
+        for name in names & current:
+            self._mark(name)
+        if self.journal.offset > COMPACT_BYTES:
+            self.compact()
+
+    def _records(self, ops):
+        """Journal records for the queued operations, big row lists split into OP_ROWS chunks."""
+        for table, kind, *args in ops:
+            if kind == "insert":
+                rows = list(map(table.values, args[0]))
+                for i in range(0, max(len(rows), 1), OP_ROWS):
+                    yield [table.name, kind, rows[i:i + OP_ROWS]]
+            elif kind == "assign":
+                for i in range(0, len(args[0]), OP_ROWS):
+                    yield [table.name, kind, args[0][i:i + OP_ROWS], args[1]]
+            else:
+                yield [table.name, kind, *args]
+
+    @timed("csv.checkpoint")
+    def compact(self, also=()):
+        """Fold the journal (and the tables named in `also`) into the CSV files and start an empty one."""
+        with self.journal.locked():
+            current = [n for n in self.tables if self._current(n)]
+            self.journal.tail()
+            current = [n for n in current if self._current(n)]
+            names = [n for n in self.paths if n in self.journal.touched or n in also]
+            temps = []
+            for name in names:
+                table = self.tables[name]
+                rows = table.rows.values() if name in current else self._replayed(table, self.journal.operations(name)).rows.values()
+                temps.append((write_csv_temp(self.paths[name], map(table.values, rows), table.headers), self.paths[name]))
+            self.journal.compact(temps)
+            for name in current:
+                self._mark(name)
+
+    def insert(self, table, rows):
+        with self.transaction():
+            self._ops.append((table, "insert", rows))
+
+    def update(self, table, key, row):
+        with self.transaction():
+            self._ops.append((table, "update", key, list(table.values(row))))
+
+    def delete(self, table, keys):
+        with self.transaction():
+            self._ops.append((table, "delete", list(keys)))
+
+    def reassign(self, table, column, old_values, new_value):
+        with self.transaction():
+            self._ops.append((table, "reassign", column, list(old_values), new_value))
+
+    def assign(self, table, keys, changes):
+        with self.transaction():
+            self._ops.append((table, "assign", list(keys), dict(changes)))
+
+
+def open_repository():
+    """The Repository on the configured backend.
+
+    Set SSIS_SERVER to the URL of a running server.py to work through that
+    service, or SSIS_DB to a database path to use the SQLite backend; the
+    CSV files next to this module are used otherwise.
+    """
+    server = os.environ.get("SSIS_SERVER")
+    if server:
+        from remote import RemoteRepository
+        return RemoteRepository(server)
+    db = os.environ.get("SSIS_DB")
+    if db:
+        from sqlite_store import SqliteBackend
+        return Repository(backend=SqliteBackend(db))
+    ensure_csv(STUDENT_CSV, STUDENT_HEADERS)
+    ensure_csv(PROGRAM_CSV, PROGRAM_HEADERS)
+    ensure_csv(COLLEGE_CSV, COLLEGE_HEADERS)
+    return Repository()
+
+
+class Repository:
+    """Loads the three tables once and serves every view and mutation from memory.
+
+    Storage goes through a backend (CSV by default). `refresh()` reloads only
+    the tables whose backend signature (for CSV, the file's mtime/size)
+    changed since they were last read or written by this process. `version`
+    increases on every reload or mutation so derived views know when to
+    resync. `lock` guards the tables for readers on other threads (see the
+    live search worker).
+
+    Mutations made inside `batch()` reach storage as one atomic write; the
+    cascade helpers (`update_cascade`, `delete_cascade`) use it so a rename
+    or delete and everything that references it land together.
+    """
+
+    CHILDREN = {"colleges": "programs", "programs": "students"}
+
+    def __init__(self, student_csv=STUDENT_CSV, program_csv=PROGRAM_CSV, college_csv=COLLEGE_CSV, backend=None):
+        self.backend = backend or CsvBackend(student_csv, program_csv, college_csv)
+        self.students = Table("students", STUDENT_HEADERS, "id", ref="prog_code", counted=("year", "gender"))
+        self.programs = Table("programs", PROGRAM_HEADERS, "prog_code", ref="college_code")
+        self.colleges = Table("colleges", COLLEGE_HEADERS, "college_code")
+        self.tables = {t.name: t for t in (self.students, self.programs, self.colleges)}
+        self._file_mtimes = {}
+        self._pending = None
+        self.version = 0
+        self.lock = threading.RLock()
+        self.refresh()
+
+    def refresh(self):
+        """Catch up with changes made elsewhere (reloading tables that need it); return the changed names."""
+        with self.lock:
+            if self._pending is not None:
+                return []
+            return self._catch_up()
+
+    def _catch_up(self):
+        changed = self.backend.catch_up()
+        for name in changed:
+            self._file_mtimes[name] = self.backend.signature(self.tables[name])
+        for t in self.tables.values():
+            sig = self.backend.signature(t)
+            if self._file_mtimes.get(t.name, False) != sig:
+                t.load(self.backend.load(t))
+                self._file_mtimes[t.name] = self.backend.signature(t)
+                if t.name not in changed: changed.append(t.name)
+        if changed:
+            self.version += 1
+        return changed
+
+    @contextmanager
+    def batch(self):
+        """Group mutations into a single atomic write across tables.
+
+        The outermost batch holds the backend's write lock throughout and
+        starts by catching up with other writers, so the checks made inside
+        it (duplicate keys, version stamps) see what is really stored.
+        """
+        with self.lock:
+            outer = self._pending is None
+            try:
+                with self.backend.transaction():
+                    if outer:
+                        self._catch_up()
+                        self._pending = set()
+                    yield
+            except BaseException:
+                if outer and self._pending is not None:
+                    # Memory may hold half the batch; reread what storage really has.
+                    for name in self._pending:
+                        self._file_mtimes.pop(name, None)
+                    self._pending = None
+                    self.refresh()
+                raise
+            if outer:
+                pending, self._pending = self._pending, None
+                for name in pending:
+                    self._file_mtimes[name] = self.backend.signature(self.tables[name])
+                self.version += 1
+
+    def _saved(self, table):
+        """Note that `table` is about to change, so a failed batch reloads it."""
+        self._pending.add(table.name)
+
+    def insert(self, name, row):
+        """Add one row, appending it to storage instead of rewriting it."""
+        return self.insert_many(name, [row])[0]
+
+    def insert_many(self, name, rows):
+        """Add rows with a single append; IDs are checked against the in-memory key index."""
+        t = self.tables[name]
+        rows = [t.conform(r) for r in rows]
+        with self.batch():
+            seen = set()
+            for r in rows:
+                k = r[t.pk]
+                if k in t.rows or k in seen:
+                    raise KeyError(k)
+                seen.add(k)
+            self._saved(t)
+            for r in rows:
+                t.add(r)
+            self.backend.insert(t, rows)
+        return rows
+
+    def stamp(self, name, key):
+        """Version stamp of a row (None if it doesn't exist), to pass back as `expected`."""
+        return self.tables[name].stamp(key)
+
+    def existing(self, name, keys):
+        """The keys among `keys` that table `name` holds, as a set."""
+        with self.lock:
+            rows = self.tables[name].rows
+            return {k for k in keys if k in rows}
+
+    def update(self, name, key, row, expected=None):
+        """Replace the row stored under `key`, keeping its position if the key changes.
+
+        With `expected` (a stamp() taken when the row was read), ConflictError
+        is raised instead if the row was changed or deleted since.
+        """
+        t = self.tables[name]
+        row = t.conform(row)
+        new_key = row[t.pk]
+        with self.batch():
+            if expected is not None and t.stamp(key) != expected:
+                raise ConflictError(name, key)
+            if key not in t.rows:
+                return None
+            if new_key != key and new_key in t.rows:
+                raise KeyError(new_key)
+            self._saved(t)
+            t.replace(key, row)
+            self.backend.update(t, key, row)
+        return row
+
+    def delete(self, name, keys):
+        t = self.tables[name]
+        keys = set(keys)
+        with self.batch():
+            self._saved(t)
+            t.discard(keys)
+            self.backend.delete(t, keys)
+
+    def reassign(self, name, column, old_values, new_value):
+        """Set `column` to `new_value` on every row where it is one of `old_values`; return the count."""
+        t = self.tables[name]
+        old_values = set(old_values)
+        with self.batch():
+            if column == t.ref:
+                hits = t.referencing(old_values)
+            else:
+                hits = {k for k, r in t.rows.items() if r[column] in old_values}
+            if hits:
+                self._saved(t)
+                t.set_value(hits, column, new_value)
+                self.backend.reassign(t, column, old_values, new_value)
+        return len(hits)
+
+    # ── Validation ───────────────────────────────────────────────────────────
+
+    def resolve_program(self, value):
+        """Program code for a program name or code ("" for Not Enrolled); None if unknown."""
+        if not value or value == NOT_ENROLLED:
+            return ""
+        if value in self.programs:
+            return value
+        return next((p["prog_code"] for p in self.programs if p["name"] == value), None)
+
+    def student_error(self, row, old_id=None):
+        """Why a student row can't be saved (None if it can); `old_id` when editing."""
+        if not ID_PATTERN.match(row.get("id", "")):
+            return "ID must follow format YYYY-NNNN (e.g. 2024-0001)"
+        if row["id"] != old_id and row["id"] in self.students:
+            return f"Student ID {row['id']} already exists."
+        if not all(row.get(f) for f in ("firstname", "lastname", "year", "gender")):
+            return "Please fill all fields."
+        if row["year"] not in YEAR_LEVELS:
+            return f"Year must be one of {', '.join(YEAR_LEVELS)}."
+        if row["gender"] not in GENDERS:
+            return f"Gender must be one of {', '.join(GENDERS)}."
+        if row.get("prog_code") and row["prog_code"] not in self.programs:
+            return f"Unknown program '{row['prog_code']}'."
+        return None
+
+    # ── Cascades ─────────────────────────────────────────────────────────────
+
+    def cascade_counts(self, name, keys):
+        """(programs, students) touched by deleting `keys` from table `name`, from the reverse indexes."""
+        if name == "colleges":
+            progs = self.programs.referencing(keys)
+            return len(progs), len(self.students.referencing(progs))
+        if name == "programs":
+            return 0, len(self.students.referencing(keys))
+        return 0, 0
+
+    def update_cascade(self, name, key, row, expected=None):
+        """Update a row and repoint the rows that reference it, in one atomic write."""
+        with self.batch():
+            row = self.update(name, key, row, expected)
+            child = self.CHILDREN.get(name)
+            pk = self.tables[name].pk
+            if row is not None and child and row[pk] != key:
+                self.reassign(child, self.tables[child].ref, [key], row[pk])
+        return row
+
+    def delete_cascade(self, name, keys):
+        """Delete rows with their dependents, in one atomic write.
+
+        Deleting colleges deletes their programs; students of deleted
+        programs become Not Enrolled.
+        """
+        keys = set(keys)
+        with self.batch():
+            progs = self.programs.referencing(keys) if name == "colleges" else (keys if name == "programs" else set())
+            self.delete(name, keys)
+            if name == "colleges" and progs:
+                self.delete("programs", progs)
+            if progs:
+                self.reassign("students", "prog_code", progs, "")
+
+    # ── Bulk edits ───────────────────────────────────────────────────────────
+
+    def assign_error(self, name, changes):
+        """Why `changes` can't be applied to rows of table `name` in bulk (None if they can)."""
+        t = self.tables[name]
+        if not changes:
+            return "Choose at least one field to change."
+        if t.pk in changes or not set(changes) <= set(t.headers):
+            return f"Only {', '.join(h for h in t.headers if h != t.pk)} can be changed in bulk."
+        if name == "students":
+            if "year" in changes and changes["year"] not in YEAR_LEVELS:
+                return f"Year must be one of {', '.join(YEAR_LEVELS)}."
+            if "gender" in changes and changes["gender"] not in GENDERS:
+                return f"Gender must be one of {', '.join(GENDERS)}."
+            if changes.get("prog_code") and changes["prog_code"] not in self.programs:
+                return f"Unknown program '{changes['prog_code']}'."
+        return None
+
+    def _assign_hits(self, t, keys, changes):
+        rows = t.rows
+        return [k for k in keys if k in rows and any(rows[k][c] != v for c, v in changes.items())]
+
+    def assign_preview(self, name, keys, changes):
+        """How many of the rows `keys` assign() would actually change."""
+        with self.lock:
+            return len(self._assign_hits(self.tables[name], keys, changes))
+
+    def assign(self, name, keys, changes):
+        """Set the columns in `changes` on every row in `keys`, in one atomic write.
+
+        Rows that already hold those values are left alone. Returns the undo
+        record for undo_assign(): {key: [stamp after, {column: value before}]}.
+        """
+        error = self.assign_error(name, changes)
+        if error:
+            raise ValueError(error)
+        t = self.tables[name]
+        with self.batch():
+            hits = self._assign_hits(t, keys, changes)
+            before = {k: {c: t.rows[k][c] for c in changes} for k in hits}
+            if hits:
+                self._saved(t)
+                t.assign(hits, changes)
+                self.backend.assign(t, hits, changes)
+            return {k: [t.stamp(k), before[k]] for k in hits}
+
+    def undo_assign(self, name, undo):
+        """Put back the rows an assign() changed, in one atomic write; return (restored, skipped).
+
+        Rows changed again or deleted since then are skipped, not overwritten.
+        """
+        t = self.tables[name]
+        with self.batch():
+            groups = {}
+            for k, (stamp, old) in undo.items():
+                if t.stamp(k) == stamp:
+                    groups.setdefault(tuple(sorted(old.items())), []).append(k)
+            if groups:
+                self._saved(t)
+            for old, keys in groups.items():
+                t.assign(keys, dict(old))
+                self.backend.assign(t, keys, dict(old))
+        restored = sum(map(len, groups.values()))
+        return restored, len(undo) - restored
+
+    # ── Statistics ───────────────────────────────────────────────────────────
+
+    def enrollment(self):
+        """Student counts by year, gender, program and college, from the running counters.
+
+        Costs a pass over the programs, never over the students: year and
+        gender are counted columns, a program's count is the size of its
+        reverse index entry. "program" and "college" are [code, name, count]
+        lists in table order, including empty ones. Students without a
+        (known) program are `not_enrolled`, those in a program without a
+        known college `no_college`.
+        """
+        with self.lock:
+            students = self.students
+            programs = [[p["prog_code"], p["name"], len(students.refs.get(p["prog_code"], ()))] for p in self.programs]
+            by_college = {}
+            for p, (_, _, n) in zip(self.programs, programs):
+                by_college[p["college_code"]] = by_college.get(p["college_code"], 0) + n
+            colleges = [[c["college_code"], c["name"], by_college.get(c["college_code"], 0)] for c in self.colleges]
+            enrolled = sum(n for _, _, n in programs)
+            return {"students": len(students), "programs": len(self.programs), "colleges": len(self.colleges),
+                    "year": dict(students.counts["year"]), "gender": dict(students.counts["gender"]),
+                    "program": programs, "college": colleges, "not_enrolled": len(students) - enrolled,
+                    "no_college": enrolled - sum(n for _, _, n in colleges)}
@@ -0,0 +1,107 @@
+"""Crash recovery of the CSV backend's write-ahead journal (journal.py).
+
+Each test leaves the files the way a writer that died at some point would
+have, then opens a fresh Repository on them and checks what it recovers.
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from store import (Repository, ensure_csv, iter_csv, write_csv_temp, JOURNAL_NAME,  # noqa: E402
+                   STUDENT_HEADERS, PROGRAM_HEADERS, COLLEGE_HEADERS)
+
+
+def student(id, lastname="Cruz"):
+    return {"id": id, "firstname": "Ana", "lastname": lastname, "prog_code": "BSCS", "year": "1", "gender": "Female"}
+
+
+class RecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        d = self.dir.name
+        self.paths = [os.path.join(d, f) for f in ("student.csv", "program.csv", "college.csv")]
+        for path, headers in zip(self.paths, (STUDENT_HEADERS, PROGRAM_HEADERS, COLLEGE_HEADERS)):
+            ensure_csv(path, headers)
+        self.journal = os.path.join(d, JOURNAL_NAME)
+        repo = self.open()
+        repo.insert("colleges", {"college_code": "CCS", "name": "College Of Computer Studies"})
+        repo.insert("programs", {"prog_code": "BSCS", "name": "BS Computer Science", "college_code": "CCS"})
+        repo.insert("students", student("2024-0001"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def open(self):
+        return Repository(*self.paths)
+
+    def append(self, *lines):
+        with open(self.journal, "ab") as f:
+            for line in lines:
+                f.write(line if isinstance(line, bytes) else json.dumps(line).encode() + b"\n")
+
+    def test_torn_tail_is_cut_off(self):
+        size = os.path.getsize(self.journal)
+        self.append(b'{"tx": 4, "tables": ["students"], "ops": [["stud')
+        repo = self.open()
+        self.assertIn("2024-0001", repo.students)
+        self.assertEqual(os.path.getsize(self.journal), size)
+        repo.insert("students", student("2024-0002"))
+        self.assertIn("2024-0002", self.open().students)
+
+    def test_uncommitted_transaction_is_rolled_back(self):
+        size = os.path.getsize(self.journal)
+        values = [student("2024-0009")[h] for h in STUDENT_HEADERS]
+        self.append({"begin": 4}, {"seq": 4, "op": ["students", "insert", [values]]},
+                    {"seq": 4, "op": ["students", "delete", ["2024-0001"]]})
+        repo = self.open()
+        self.assertNotIn("2024-0009", repo.students)
+        self.assertIn("2024-0001", repo.students)
+        self.assertEqual(os.path.getsize(self.journal), size)
+
+    def test_writer_cuts_off_a_dead_writers_transaction(self):
+        repo = self.open()
+        values = [student("2024-0009")[h] for h in STUDENT_HEADERS]
+        self.append({"begin": 4}, {"seq": 4, "op": ["students", "insert", [values]]})
+        repo.insert("students", student("2024-0002"))
+        other = self.open()
+        self.assertIn("2024-0002", other.students)
+        self.assertNotIn("2024-0009", other.students)
+
+    def test_interrupted_compaction_is_rolled_forward(self):
+        repo = self.open()
+        repo.update("students", "2024-0001", student("2024-0001", lastname="Reyes"))
+        temps = [[write_csv_temp(path, map(t.values, t.rows.values()), t.headers), path]
+                 for path, t in zip(self.paths, (repo.students, repo.programs, repo.colleges))]
+        self.append({"compact": temps})
+        os.replace(*temps[0])  # died after renaming the first file
+        repo = self.open()
+        self.assertEqual(repo.students.get("2024-0001")["lastname"], "Reyes")
+        self.assertFalse(any(os.path.exists(tmp) for tmp, _ in temps))
+        self.assertEqual([r["lastname"] for r in iter_csv(self.paths[0])], ["Reyes"])
+        with open(self.journal) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(len(repo.programs), 1)
+
+    def test_compaction_keeps_committed_changes(self):
+        repo = self.open()
+        repo.insert("students", student("2024-0002"))
+        repo.delete_cascade("programs", ["BSCS"])
+        repo.backend.compact()
+        repo = self.open()
+        self.assertEqual(sorted(repo.students.rows), ["2024-0001", "2024-0002"])
+        self.assertEqual({r["prog_code"] for r in repo.students}, {""})
+        self.assertEqual(len(repo.programs), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,408 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from itertools import islice
+
+from profiling import span, timed
+from search import SearchIndex, FacetIndex
+
+STUDENT_COLUMNS = ["ID", "Name", "Gender", "Year", "Program Code", "Program Name", "College Code", "College Name"]
+PROGRAM_COLUMNS = ["Code", "Program Name", "College Code", "College Name"]
+COLLEGE_COLUMNS = ["Code", "College Name"]
+PAGE_SIZE = 100
+
+# One page of a view: its rows, the number of matching rows, the position of
+# the first row, and keyset cursors for the first and last rows.
+Page = namedtuple("Page", "rows total offset first last")
+
+
+def natural_key(value):
+    """Sort key putting digit strings first, numerically, then the rest case-insensitively."""
+    val = str(value)
+    return (0, int(val)) if val.isdigit() else (1, val.lower())
+
+
+class _Desc:
+    """Wraps a sort key so it compares in reverse (for descending cursor columns)."""
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+def dump_cursor(cursor):
+    """A page cursor as plain JSON data: [[descending, *sort key], ..., table position]."""
+    if cursor is None:
+        return None
+    return [[1, *k.key] if isinstance(k, _Desc) else [0, *k] for k in cursor[:-1]] + [cursor[-1]]
+
+
+def load_cursor(data):
+    """The page cursor saved by dump_cursor()."""
+    if data is None:
+        return None
+    return tuple(_Desc(tuple(k[1:])) if k[0] else tuple(k[1:]) for k in data[:-1]) + (data[-1],)
+
+
+class SectionView:
+    """The display rows of one section, kept in step with the repository.
+
+    Rows are rebuilt only when the repository version moves, and the search
+    index (built on the first non-empty query) is then updated only for the
+    rows that were added, changed or removed.
+    """
+    columns = []
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.rows = {}
+        self.order = {}
+        self.index = None
+        self._ranks = {}
+        self._paged = None
+        self._version = None
+
+    def build_rows(self):
+        raise NotImplementedError
+
+    def sync(self):
+        if self._version == self.repo.version:
+            return
+        self._version = self.repo.version
+        with span("view.build") as timing:
+            self._replace_rows(self.build_rows())
+            timing.rows = len(self.rows)
+
+    def _replace_rows(self, new):
+        old = self.rows
+        self._ranks = {}
+        if self.index is not None:
+            for k in old.keys() - new.keys():
+                self._unindex(k, old[k])
+            for k, r in new.items():
+                o = old.get(k)
+                if o != r:
+                    self._index(k, r, o)
+        self.rows = new
+        self.order = {k: i for i, k in enumerate(new)}
+
+    def _build_index(self):
+        self.index = SearchIndex()
+        for k, r in self.rows.items():
+            self._index(k, r, None)
+
+    def _ensure_index(self):
+        if self.index is None:
+            self._build_index()
+
+    def _index(self, key, row, old):
+        self.index.update(key, row)
+
+    def _unindex(self, key, row):
+        self.index.remove(key)
+
+    def _search_keys(self, query):
+        return self.index.search(query)
+
+    def matching_keys(self, query):
+        """Keys of rows with `query` (case-insensitive) in any column; None means every row."""
+        if not query:
+            return None
+        self._ensure_index()
+        with span("view.search") as timing:
+            keys = self._search_keys(query)
+            timing.rows = len(keys)
+        return keys
+
+    def ordered(self, keys):
+        """The rows for `keys` (None for all) in table order."""
+        if keys is None:
+            return list(self.rows.values())
+        if len(keys) > len(self.rows) // 8:
+            return [r for k, r in self.rows.items() if k in keys]
+        return [self.rows[k] for k in sorted(keys, key=self.order.__getitem__)]
+
+    def matching(self, query, filters=None):
+        return self.matching_keys(query)
+
+    def keys_matching(self, query, filters=None):
+        """Set of the keys of every row matching `query` and `filters`, not just one page."""
+        with self.repo.lock:
+            self.sync()
+            keys = self.matching(query, filters)
+            return set(self.rows) if keys is None else set(keys)
+
+    def search(self, query, filters=None):
+        """Rows matching `query` (case-insensitive, any column) and `filters`, in table order."""
+        with self.repo.lock:
+            self.sync()
+            return self.ordered(self.matching(query, filters))
+
+    # ── Sorting ──────────────────────────────────────────────────────────────
+
+    def sort_ranks(self, i):
+        """{value: rank} for column `i` in natural order, cached until the rows change."""
+        ranks = self._ranks.get(i)
+        if ranks is None:
+            ranks, rank, prev = {}, -1, None
+            for v in sorted({r[i] for r in self.rows.values()}, key=natural_key):
+                key = natural_key(v)
+                if key != prev:
+                    rank, prev = rank + 1, key
+                ranks[v] = rank
+            self._ranks[i] = ranks
+        return ranks
+
+    def sort_rows(self, rows, spec):
+        """Stable in-place sort of `rows` by [(column index, reverse), ...], most significant first.
+
+        Rows are compared by the integer rank of each value in the column's
+        cached natural order, so a sort costs one dict lookup per row and
+        column rather than a natural_key() call.
+        """
+        if not spec:
+            return rows
+        with self.repo.lock:
+            self.sync()
+            keys = [(i, self.sort_ranks(i), reverse) for i, reverse in spec]
+        with span("view.sort_rows") as timing:
+            # Stable sorts from the least significant column up give the combined order.
+            for i, ranks, reverse in reversed(keys):
+                rows.sort(key=lambda r: ranks.get(r[i], -1), reverse=reverse)
+            timing.rows = len(rows)
+        return rows
+
+    def iter_rows(self, query="", filters=None, sort=None):
+        """Yield the matching rows one by one, for streaming exports.
+
+        Only references to the matching rows are collected (under the lock),
+        never copies of them. `sort` is a sort_rows() spec; default is table
+        order.
+        """
+        with self.repo.lock:
+            self.sync()
+            rows = self.sort_rows(self.ordered(self.matching(query, filters)), sort)
+        yield from rows
+
+    # ── Paging ───────────────────────────────────────────────────────────────
+
+    def cursor(self, key, sort):
+        """Keyset cursor for the row `key` under `sort`: its sort values, then its table position."""
+        row = self.rows[key]
+        return tuple(_Desc(natural_key(row[i])) if reverse else natural_key(row[i]) for i, reverse in sort or ()) + (self.order[key],)
+
+    def _page_keys(self, query, filters, sort):
+        sig = (self._version, query, tuple(sorted((f, tuple(v)) for f, v in (filters or {}).items() if v)), tuple(sort or ()))
+        if self._paged is None or self._paged[0] != sig:
+            keys, rows = self.matching(query, filters), self.rows
+            with span("view.sort") as timing:
+                if keys is None:
+                    keys = list(rows)
+                elif len(keys) > len(rows) // 8:
+                    keys = [k for k in rows if k in keys]
+                else:
+                    keys = sorted(keys, key=self.order.__getitem__)
+                for i, reverse in reversed(sort or ()):
+                    ranks = self.sort_ranks(i)
+                    keys.sort(key=lambda k: ranks.get(rows[k][i], -1), reverse=reverse)
+                timing.rows = len(keys)
+            self._paged = (sig, keys)
+        return self._paged[1]
+
+    @timed("view.page")
+    def page(self, query="", filters=None, sort=None, size=PAGE_SIZE, cursor=None, direction="next", offset=None):
+        """One Page of the matching rows in `sort` order, with the total count.
+
+        Pages are addressed by keyset cursors (a Page's `first`/`last`):
+        "next" starts after `cursor`, "prev" ends before it and "at" starts
+        on it, so a page stays on the same rows while others come and go.
+        `offset` jumps to a row position instead. The ordered key list is
+        cached until the rows, query, filters or sort change, so turning a
+        page costs a bisect plus the rows on it.
+        """
+        with self.repo.lock:
+            self.sync()
+            at = lambda k: self.cursor(k, sort)
+            if not (sort or query or cursor or offset or (filters and any(filters.values()))):
+                # Opening a section: the first rows in table order, without building the key list.
+                chunk = list(islice(self.rows, size))
+                return Page([self.rows[k] for k in chunk], len(self.rows), 0,
+                            at(chunk[0]) if chunk else None, at(chunk[-1]) if chunk else None)
+            keys = self._page_keys(query, filters, sort)
+            if offset is not None: start = offset
+            elif cursor is None: start = 0
+            elif direction == "prev": start = bisect_left(keys, cursor, key=at) - size
+            elif direction == "at": start = bisect_left(keys, cursor, key=at)
+            else: start = bisect_right(keys, cursor, key=at)
+            if start >= len(keys):
+                start = len(keys) - size
+            # Fewer than `size` rows before the cursor (or none left there): the first full page.
+            start = max(0, start)
+            chunk = keys[start:start + size]
+            if not chunk:
+                return Page([], len(keys), 0, None, None)
+            return Page([self.rows[k] for k in chunk], len(keys), start, at(chunk[0]), at(chunk[-1]))
+
+
+class StudentView(SectionView):
+    """Students joined with their program and college.
+
+    The joined rows are a materialized cache: the four program/college
+    columns are resolved once per program, and after the first build only
+    the students named in the table journal, or in a program whose joined
+    columns changed, are re-joined. Those four columns are shared by every
+    student in the same program, so they are also indexed once per distinct
+    group rather than once per student; a group hit expands to all of its
+    members. The filter panel's facets (gender, year, program name, college
+    name) are kept as posting sets alongside the search index.
+    """
+    columns = STUDENT_COLUMNS
+    FACETS = {"gender": 2, "year": 3, "program": 5, "college": 7}
+    NOT_ENROLLED = ("N/A", "Not Enrolled", "N/A", "N/A")
+
+    def __init__(self, repo):
+        super().__init__(repo)
+        self.joins = {}
+        self._mark = None
+        self._end = 0
+
+    def build_joins(self):
+        """{prog_code: (code, program name, college code, college name)} for every program."""
+        c_map = {c["college_code"]: c["name"] for c in self.repo.colleges}
+        return {p["prog_code"]: (p["prog_code"], p["name"], p["college_code"], c_map.get(p["college_code"], "N/A"))
+                for p in self.repo.programs}
+
+    def join(self, s):
+        code = s["prog_code"]
+        group = self.joins.get(code) or ((code, "Not Enrolled", "N/A", "N/A") if code else self.NOT_ENROLLED)
+        return (s["id"], f"{s['lastname']}, {s['firstname']}", s["gender"], s["year"]) + group
+
+    def build_rows(self):
+        return {s["id"]: self.join(s) for s in self.repo.students}
+
+    def sync(self):
+        if self._version == self.repo.version:
+            return
+        self._version = self.repo.version
+        students = self.repo.students
+        joins = self.build_joins()
+        stale = {c for c in joins.keys() | self.joins.keys() if joins.get(c) != self.joins.get(c)}
+        self.joins = joins
+        journal, self._mark = students.changes_since(self._mark)
+        if journal is None:
+            with span("view.build") as timing:
+                self._replace_rows(self.build_rows())
+                self._end = len(self.rows)
+                timing.rows = len(self.rows)
+            return
+        with span("view.join") as timing:
+            timing.rows = self._rejoin(journal, stale)
+
+    def _rejoin(self, journal, stale):
+        """Re-join the students named in the table journal or in a program whose columns changed; return how many."""
+        students = self.repo.students
+        keys = dict.fromkeys(k for k in journal if k is not None)
+        # After a delete or rename, a key that is still (or again) present may sit elsewhere in the table.
+        moved = None in journal and any(k in students.rows for k in keys)
+        keys.update(dict.fromkeys(students.referencing(stale)))
+        for k in keys:
+            old, s = self.rows.get(k), students.get(k)
+            if s is None:
+                if old is not None:
+                    del self.rows[k]; del self.order[k]
+                    if self.index is not None: self._unindex(k, old)
+                continue
+            row = self.join(s)
+            if row == old:
+                continue
+            if old is None and not moved:
+                self.order[k] = self._end; self._end += 1
+            for i in [i for i, ranks in self._ranks.items() if row[i] not in ranks]:
+                del self._ranks[i]
+            self.rows[k] = row
+            if self.index is not None: self._index(k, row, old)
+        if moved:
+            self.rows = {k: self.rows[k] for k in students.rows}
+            self.order = {k: i for i, k in enumerate(self.rows)}
+            self._end = len(self.rows)
+        return len(keys)
+
+    def _build_index(self):
+        self.groups = SearchIndex()
+        self.members = {}
+        self.facets = FacetIndex(self.FACETS)
+        super()._build_index()
+
+    def _index(self, key, row, old):
+        self.index.update(key, row[:4])
+        self.facets.update(key, {f: row[i] for f, i in self.FACETS.items()})
+        group = tuple(row[4:])
+        if old is not None:
+            if tuple(old[4:]) == group:
+                return
+            self._leave(key, tuple(old[4:]))
+        members = self.members.setdefault(group, set())
+        if not members:
+            self.groups.add(group, group)
+        members.add(key)
+
+    def _unindex(self, key, row):
+        self.index.remove(key)
+        self.facets.remove(key)
+        self._leave(key, tuple(row[4:]))
+
+    def _leave(self, key, group):
+        members = self.members.get(group, set())
+        members.discard(key)
+        if not members and group in self.members:
+            del self.members[group]
+            self.groups.remove(group)
+
+    def _search_keys(self, query):
+        keys = self.index.search(query)
+        for group in self.groups.search(query):
+            keys |= self.members[group]
+        return keys
+
+    def matching(self, query, filters=None):
+        keys = self.matching_keys(query)
+        if filters and any(filters.values()):
+            self._ensure_index()
+            selected = self.facets.select(filters)
+            keys = selected if keys is None else (selected & keys)
+        return keys
+
+    def facet_counts(self, query, filters):
+        """{facet: {value: count}} for the filter panel, under the search and the other facets."""
+        with self.repo.lock:
+            self.sync()
+            self._ensure_index()
+            return self.facets.counts(filters, self.matching_keys(query))
+
+
+class ProgramView(SectionView):
+    columns = PROGRAM_COLUMNS
+
+    def build_rows(self):
+        c_map = {c["college_code"]: c["name"] for c in self.repo.colleges}
+        return {p["prog_code"]: [p["prog_code"], p["name"], p["college_code"], c_map.get(p["college_code"], "N/A")]
+                for p in self.repo.programs}
+
+
+class CollegeView(SectionView):
+    columns = COLLEGE_COLUMNS
+
+    def build_rows(self):
+        return {c["college_code"]: [c["college_code"], c["name"]] for c in self.repo.colleges}
+
+
+def make_views(repo):
+    """One view per sidebar section, sharing `repo` (a remote repository supplies its own)."""
+    if hasattr(repo, "make_views"):
+        return repo.make_views()
+    return {"Students": StudentView(repo), "Programs": ProgramView(repo), "Colleges": CollegeView(repo)}
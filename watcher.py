@@ -0,0 +1,84 @@
+"""Event-driven change notification for the data files (Linux inotify via ctypes).
+
+The directories holding the files are watched rather than the files
+themselves, because atomic saves rename a new file over the old one and an
+inode watch would go quiet after the first save.
+"""
+import ctypes
+import ctypes.util
+import os
+import struct
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Reports which of `paths` were written, created, deleted or renamed over.
+
+    `fileno()` becomes readable when events are queued, so the descriptor can
+    be handed to select() or a GUI loop's file handler; `read()` drains the
+    queue and returns the set of affected paths, coalescing repeated events.
+    """
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {os.path.abspath(p) for p in paths}
+        self.dirs = {}
+        for d in {os.path.dirname(p) for p in self.paths}:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(err, f"inotify_add_watch failed for {d}")
+            self.dirs[wd] = d
+
+    def fileno(self):
+        return self.fd
+
+    def read(self):
+        changed = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _cookie, length = _EVENT.unpack_from(buf, pos)
+                name = buf[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+                pos += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    changed |= self.paths
+                    continue
+                path = os.path.join(self.dirs.get(wd, ""), os.fsdecode(name))
+                if path in self.paths:
+                    changed.add(path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(paths):
+    """An InotifyWatcher for `paths`, or None where inotify is unavailable (or nothing is on disk)."""
+    if not paths:
+        return None
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError, TypeError):
+        return None